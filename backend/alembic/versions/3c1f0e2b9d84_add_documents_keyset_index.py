@@ -0,0 +1,32 @@
+"""Add composite keyset pagination index to documents
+
+Revision ID: 3c1f0e2b9d84
+Revises: a7a6fd789b45
+Create Date: 2026-10-19 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0e2b9d84'
+down_revision: Union[str, Sequence[str], None] = 'a7a6fd789b45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_documents_user_created_id',
+        'documents',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_user_created_id', table_name='documents')
@@ -0,0 +1,34 @@
+"""Add materialized analysis summary columns to documents
+
+Revision ID: 8e4b6d2f1a57
+Revises: 3c1f0e2b9d84
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b6d2f1a57'
+down_revision: Union[str, Sequence[str], None] = '3c1f0e2b9d84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('risk_count', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('risk_categories', sa.JSON(), nullable=True))
+    op.add_column('documents', sa.Column('analysis_source', sa.String(length=50), nullable=True))
+    op.add_column('documents', sa.Column('analyzed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'analyzed_at')
+    op.drop_column('documents', 'analysis_source')
+    op.drop_column('documents', 'risk_categories')
+    op.drop_column('documents', 'risk_count')
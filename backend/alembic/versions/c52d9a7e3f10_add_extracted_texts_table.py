@@ -0,0 +1,40 @@
+"""Add extracted_texts cache table
+
+Revision ID: c52d9a7e3f10
+Revises: 8e4b6d2f1a57
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52d9a7e3f10'
+down_revision: Union[str, Sequence[str], None] = '8e4b6d2f1a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'extracted_texts',
+        sa.Column('file_hash', sa.String(length=64), primary_key=True),
+        sa.Column('extractor_version', sa.Integer(), nullable=False),
+        sa.Column('text_zlib', sa.LargeBinary(), nullable=False),
+        sa.Column('text_length', sa.Integer(), nullable=False),
+        sa.Column('engine', sa.String(length=50), nullable=False),
+        sa.Column('language', sa.String(length=50), nullable=True),
+        sa.Column('page_count', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('pages_ocr', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('duration_ms', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('extracted_texts')
@@ -0,0 +1,28 @@
+"""Add sha256 of the stored bytes to documents
+
+Revision ID: d41b7c9e2a63
+Revises: c52d9a7e3f10
+Create Date: 2026-10-19 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b7c9e2a63'
+down_revision: Union[str, Sequence[str], None] = 'c52d9a7e3f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'sha256')
@@ -0,0 +1,29 @@
+"""Add the extraction settings fingerprint to extracted_texts
+
+Revision ID: e6f2a8c4b915
+Revises: d41b7c9e2a63
+Create Date: 2026-10-19 16:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f2a8c4b915'
+down_revision: Union[str, Sequence[str], None] = 'd41b7c9e2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows have no fingerprint and are re-extracted on their next lookup
+    op.add_column('extracted_texts', sa.Column('extractor_fingerprint', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('extracted_texts', 'extractor_fingerprint')
@@ -0,0 +1 @@
+# Benchmarks for Haniphei.ai backend
@@ -0,0 +1,135 @@
+"""
+Benchmark the adaptive OCR planner against the previous always-full-language OCR.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ocr_planner --scans path/to/mixed_scans
+    python -m benchmarks.bench_ocr_planner --khmer-font /usr/share/fonts/truetype/khmeros/KhmerOS.ttf
+
+With --scans every .pdf/.png/.jpg in the directory is extracted twice. Without
+it a synthetic mixed document is generated: text-layer English pages, scanned
+English pages and (when a Khmer font is given) scanned Khmer pages.
+Requires the tesseract binary with eng and khm traineddata.
+"""
+import argparse
+import difflib
+import io
+import json
+import os
+import time
+
+import fitz
+import pytesseract
+from PIL import Image, ImageDraw, ImageFont
+
+from core.config import settings
+from services import ocr
+
+ENGLISH_LINES = [
+    "The Contractor shall complete the works within 180 days of the start date.",
+    "Payment of 30% is due on signing; the balance in three installments.",
+    "Late completion incurs a penalty of 0.5% of the contract value per day.",
+]
+KHMER_LINES = [
+    "ភាគីទាំងពីរត្រូវគោរពតាមកិច្ចសន្យានេះ",
+    "ការទូទាត់ប្រាក់ត្រូវធ្វើឡើងក្នុងរយៈពេល ៣០ ថ្ងៃ",
+    "ការពិន័យនឹងត្រូវអនុវត្តចំពោះការយឺតយ៉ាវ",
+]
+
+
+def _render_page(lines, font) -> bytes:
+    img = Image.new("RGB", (1654, 2339), "white")
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(lines * 8):
+        draw.text((120, 150 + i * 80), line, fill="black", font=font)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def synthetic_document(khmer_font=None) -> bytes:
+    doc = fitz.open()
+    latin_font = ImageFont.load_default(size=40)
+    for _ in range(2):
+        page = doc.new_page()
+        page.insert_text((72, 72), "\n".join(ENGLISH_LINES * 10), fontsize=10)
+    for _ in range(3):
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=_render_page(ENGLISH_LINES, latin_font))
+    if khmer_font:
+        font = ImageFont.truetype(khmer_font, 40)
+        for _ in range(3):
+            page = doc.new_page()
+            page.insert_image(page.rect, stream=_render_page(KHMER_LINES, font))
+    return doc.tobytes()
+
+
+def baseline_extract(content: bytes, filename: str) -> str:
+    """Extraction as it worked before the planner: full language set on every empty page."""
+    if not filename.lower().endswith(".pdf"):
+        return pytesseract.image_to_string(Image.open(io.BytesIO(content)), lang=settings.tesseract_lang)
+    text = []
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        for page in doc:
+            page_text = page.get_text()
+            if not page_text.strip():
+                pix = page.get_pixmap()
+                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                page_text = pytesseract.image_to_string(img, lang=settings.tesseract_lang)
+            text.append(page_text)
+    return "\n".join(text)
+
+
+def run(samples, repeat: int):
+    results = []
+    for name, content in samples:
+        timings = {}
+        outputs = {}
+        for label, fn in (("baseline", lambda: baseline_extract(content, name)),
+                          ("planner", lambda: "\n".join(ocr.iter_document_pages(content, name)))):
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs[label] = fn()
+                best = min(best, time.perf_counter() - started)
+            timings[label] = best
+        similarity = difflib.SequenceMatcher(None, outputs["baseline"], outputs["planner"]).ratio()
+        results.append({
+            "sample": name,
+            "baseline_s": round(timings["baseline"], 3),
+            "planner_s": round(timings["planner"], 3),
+            "speedup": round(timings["baseline"] / max(timings["planner"], 1e-9), 2),
+            "text_similarity": round(similarity, 3),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", help="Directory of mixed Khmer/English PDFs and images")
+    parser.add_argument("--khmer-font", help="TTF used to render synthetic Khmer pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if settings.tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = settings.tesseract_cmd
+
+    if args.scans:
+        samples = []
+        for entry in sorted(os.listdir(args.scans)):
+            if entry.lower().endswith((".pdf", ".png", ".jpg", ".jpeg")):
+                with open(os.path.join(args.scans, entry), "rb") as f:
+                    samples.append((entry, f.read()))
+    else:
+        samples = [("synthetic_mixed.pdf", synthetic_document(args.khmer_font))]
+
+    results = run(samples, args.repeat)
+    report = json.dumps({"benchmark": "ocr_planner", "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
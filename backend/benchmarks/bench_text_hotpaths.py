@@ -0,0 +1,139 @@
+"""
+Micro-benchmarks for the per-document text hot paths.
+
+Usage (from backend/):
+    python -m pytest benchmarks/bench_text_hotpaths.py
+    python -m pytest benchmarks/bench_text_hotpaths.py -k khmer --benchmark-json text_hotpaths.json
+    python -m pytest benchmarks/bench_text_hotpaths.py --benchmark-compare
+
+Requires pytest-benchmark. The file is named bench_* so the regular test run
+never collects it; pass it to pytest explicitly. Every function runs against
+synthetic Khmer, English and mixed corpora of 1 KB, 32 KB and 512 KB (UTF-8),
+grouped per function so `--benchmark-group-by=group` lines the sizes up.
+
+Covered: DataCollector._detect_language, _extract_features,
+_classify_document_type and _compute_text_hash, llm._parse_json_response
+(clean JSON and JSON wrapped in prose), trainer.predict_categories against
+a small model trained on synthetic examples in a temp dir, and the compact
+model's scoring step alone (matmul + sigmoid on an already vectorized text)
+and span_extractor.extract_spans (sentence split + one batched scoring).
+"""
+import json
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from services import inference, trainer
+from services.data_collector import collector
+from services.llm import _parse_json_response
+from services.model_artifact import CompactModel, sigmoid
+from services.span_extractor import extract_spans
+
+ENGLISH_LINES = [
+    "The Contractor shall complete the works within 180 days of the start date.",
+    "Payment of 30% is due on signing; the balance in three installments.",
+    "Late completion incurs a penalty of 0.5% of the contract value per day.",
+    "The Employer may terminate this agreement if permits are not obtained.",
+    "All materials must comply with the national building code and safety rules.",
+    "The borrower shall repay the loan with interest before the due date.",
+    "Either party may terminate with 30 days notice under the governing law.",
+]
+
+KHMER_LINES = [
+    "ភាគីទាំងពីរត្រូវគោរពតាមកិច្ចសន្យានេះ",
+    "ការទូទាត់ប្រាក់ត្រូវធ្វើឡើងក្នុងរយៈពេល ៣០ ថ្ងៃ",
+    "ការពិន័យនឹងត្រូវអនុវត្តចំពោះការយឺតយ៉ាវ",
+    "អ្នកខ្ចីត្រូវសងប្រាក់កម្ចីព្រមទាំងការប្រាក់",
+    "ម៉ៅការត្រូវបញ្ចប់ការសាងសង់ផ្ទះក្នុងរយៈពេល ៦ ខែ",
+    "ភាគីណាមួយអាចបញ្ចប់កិច្ចសន្យាដោយជូនដំណឹងជាមុន",
+]
+
+LANGUAGES = ("khmer", "english", "mixed")
+SIZES = {"1k": 1024, "32k": 32 * 1024, "512k": 512 * 1024}
+
+
+def build_corpus(language: str, size: int, seed: int = 0) -> str:
+    """Shuffled contract lines until the UTF-8 encoding reaches `size` bytes."""
+    rng = random.Random(seed)
+    if language == "khmer":
+        pool = KHMER_LINES
+    elif language == "english":
+        pool = ENGLISH_LINES
+    else:
+        pool = KHMER_LINES + ENGLISH_LINES
+    lines, used = [], 0
+    while used < size:
+        line = rng.choice(pool)
+        lines.append(line)
+        used += len(line.encode("utf-8")) + 1
+    return "\n".join(lines)
+
+
+def build_llm_response(risk_count: int, wrapped: bool) -> str:
+    risks = [
+        {
+            "risk": f"Risk {i}",
+            "category": trainer.CATEGORIES[i % len(trainer.CATEGORIES)],
+            "context": ENGLISH_LINES[i % len(ENGLISH_LINES)],
+        }
+        for i in range(risk_count)
+    ]
+    body = json.dumps({"data": risks})
+    if wrapped:
+        return f"Here is the analysis you asked for:\n```json\n{body}\n```\nLet me know if you need more."
+    return body
+
+
+@pytest.fixture(scope="module", params=[(lang, size) for lang in LANGUAGES for size in SIZES], ids=lambda p: f"{p[0]}-{p[1]}")
+def corpus(request):
+    language, size = request.param
+    return build_corpus(language, SIZES[size])
+
+
+@pytest.mark.benchmark(group="detect_language")
+def test_detect_language(benchmark, corpus):
+    benchmark(collector._detect_language, corpus)
+
+
+@pytest.mark.benchmark(group="extract_features")
+def test_extract_features(benchmark, corpus):
+    benchmark(collector._extract_features, corpus)
+
+
+@pytest.mark.benchmark(group="classify_document_type")
+def test_classify_document_type(benchmark, corpus):
+    benchmark(collector._classify_document_type, corpus)
+
+
+@pytest.mark.benchmark(group="compute_text_hash")
+def test_compute_text_hash(benchmark, corpus):
+    benchmark(collector._compute_text_hash, corpus)
+
+
+@pytest.mark.benchmark(group="predict_categories")
+def test_predict_categories(benchmark, trained_model, corpus):
+    benchmark(trainer.predict_categories, corpus)
+
+
+@pytest.mark.benchmark(group="compact_scoring")
+def test_compact_scoring(benchmark, trained_model, corpus):
+    model = CompactModel.load(inference.artifact_dir())
+    columns, values = model.vectorize(corpus)
+    benchmark(lambda: sigmoid(model.score_vector(columns, values)))
+
+
+@pytest.mark.benchmark(group="extract_spans")
+def test_extract_spans(benchmark, trained_model, corpus):
+    model = inference.get_model()
+    benchmark(extract_spans, model, corpus, list(model.classes))
+
+
+@pytest.mark.benchmark(group="parse_json_response")
+@pytest.mark.parametrize("wrapped", [False, True], ids=["clean", "wrapped"])
+@pytest.mark.parametrize("risk_count", [5, 50, 500])
+def test_parse_json_response(benchmark, risk_count, wrapped):
+    content = build_llm_response(risk_count, wrapped)
+    result = benchmark(_parse_json_response, content)
+    assert len(result) == risk_count
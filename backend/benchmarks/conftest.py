@@ -0,0 +1,17 @@
+import pytest
+
+from core.config import settings
+from tests.training_samples import train_sample_model
+
+
+@pytest.fixture(scope="module")
+def trained_model(tmp_path_factory):
+    """A model trained on the shared synthetic samples in a temp dir, live for the whole module."""
+    tmp = tmp_path_factory.mktemp("model")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "data_dir", str(tmp))
+        mp.setattr(settings, "training_file", str(tmp / "training.jsonl"))
+        mp.setattr(settings, "model_file", str(tmp / "model.joblib"))
+        mp.setattr(settings, "metrics_file", str(tmp / "metrics.json"))
+        train_sample_model()
+        yield
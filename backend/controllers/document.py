@@ -1,14 +1,61 @@
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status, UploadFile, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from botocore.exceptions import BotoCoreError, ClientError
 from datetime import datetime
+from typing import Optional
+import logging
+import mimetypes
 import uuid
 
 from core.database import get_db
 from core.auth import get_current_user
 from core.config import settings
 from db.tables import Document, User
-from core.sanitizer import sanitize_filename
+from models.document import DocumentSummary, DocumentDetail, DocumentPage
+from core.sanitizer import attachment_disposition, sanitize_filename
+from core.file_validator import DOCX_MIME, DOCUMENT_UPLOAD_TYPES, validate_upload
+from core.pagination import encode_cursor, decode_cursor, document_count_cache
+from core.tracing import traced_commit
+from services.object_store import object_store
+
+logger = logging.getLogger(__name__)
+
+# Column projections for the read paths: rows come back as plain tuples and
+# are validated straight into the response models, skipping ORM hydration
+SUMMARY_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.file_type,
+    Document.file_size,
+    Document.source,
+    Document.s3_key,
+    Document.created_at,
+)
+
+DETAIL_COLUMNS = SUMMARY_COLUMNS + (
+    Document.original_filename,
+    Document.updated_at,
+    Document.risk_count,
+    Document.risk_categories,
+    Document.analysis_source,
+    Document.analyzed_at,
+)
+
+def fresh_file_url(document_id, s3_key: str, file_type: str) -> Optional[str]:
+    """
+    Presigned URL from the object store (cached for S3), or the download
+    route when the backend cannot issue one (local disk).
+    URLs expire, so they are generated on read and never persisted.
+    """
+    if file_type == "text":
+        return None
+    try:
+        url = object_store.url(s3_key)
+    except (BotoCoreError, ClientError):
+        return None
+    return url or f"/api/documents/{document_id}/download"
 
 # ============================================================================
 # UPLOAD DOCUMENT - Handles Camera, File Picker, and Gallery
@@ -23,39 +70,19 @@ async def upload_document_logic(
     """
     Upload a document file logic.
     """
-    # 1. Validate file type
-    allowed_content_types = [
-        'application/pdf',
-        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'image/jpeg',
-        'image/jpg', 
-        'image/png'
-    ]
-    
-    if file.content_type not in allowed_content_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Allowed: PDF, DOCX, JPG, PNG"
-        )
+    # 1. Validate size, sniffed type, extension and content in one pass over the spooled file
+    upload = await validate_upload(file, DOCUMENT_UPLOAD_TYPES, settings.max_file_size, keep_content=False)
     
-    # 2. Read file content
-    content = await file.read()
-    
-    # 3. Validate file size (max 10MB)
-    max_size = 10 * 1024 * 1024
-    if len(content) > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size is {max_size / (1024*1024)}MB"
-        )
-    
-    # 7. Determine file type
-    if file.content_type == 'application/pdf':
+    # 2. Determine file type from the sniffed content, not the declared header
+    if upload.mime_type == 'application/pdf':
         file_type = 'pdf'
-    elif 'wordprocessing' in file.content_type:
+        content_type = upload.mime_type
+    elif upload.mime_type in (DOCX_MIME, 'application/zip'):
         file_type = 'docx'
+        content_type = DOCX_MIME
     else:
         file_type = 'image'
+        content_type = upload.mime_type
 
     # Note: Simplified for now as S3 client and other utils are not imported/defined in this view
     # Generate unique key
@@ -63,25 +90,36 @@ async def upload_document_logic(
     unique_id = str(uuid.uuid4())[:8]
     file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'bin'
     s3_key = f"documents/{current_user.id}/{timestamp}_{unique_id}.{file_extension}"
-    s3_url = f"{settings.s3_endpoint_url}/{settings.s3_bucket_name}/{s3_key}" if settings.s3_endpoint_url else s3_key
+
+    # Stream the spooled file so the document can be downloaded and re-scanned later
+    try:
+        await object_store.put(s3_key, file.file, content_type)
+    except Exception as e:
+        logger.error(f"Failed to store document {s3_key}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to store document"
+        )
 
     # 10. Create document record in database
     safe_filename = sanitize_filename(file.filename)
     document = Document(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4(),
         user_id=current_user.id,
         filename=safe_filename,
         original_filename=safe_filename,
         file_type=file_type,
-        file_size=len(content),
+        file_size=upload.size,
         s3_key=s3_key,
-        s3_url=s3_url,
+        sha256=upload.sha256,
         source=source
     )
     
     db.add(document)
-    await db.commit()
+    with traced_commit("document_upload"):
+        await db.commit()
     await db.refresh(document)
+    document_count_cache.invalidate(current_user.id)
 
     return {
         "id": document.id,
@@ -89,7 +127,7 @@ async def upload_document_logic(
         "file_type": document.file_type,
         "file_size": document.file_size,
         "source": document.source,
-        "s3_url": document.s3_url,
+        "s3_url": fresh_file_url(document.id, document.s3_key, document.file_type),
         "created_at": document.created_at,
         "message": f"Document uploaded successfully via {source}"
     }
@@ -102,84 +140,107 @@ async def list_documents_logic(
     limit: int,
     source: str,
     db: AsyncSession,
-    current_user: User
+    current_user: User,
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
     """
     Get all documents logic.
+
+    Pages are keyset-based when a cursor is given: rows strictly older than
+    the cursor's (created_at, id) are read straight off the composite index,
+    so deep pages cost the same as the first one. `skip` is kept for
+    backwards compatibility and ignored when a cursor is present.
     """
-    stmt = select(Document).where(Document.user_id == current_user.id)
+    stmt = select(*SUMMARY_COLUMNS).where(Document.user_id == current_user.id)
     
     if source:
         stmt = stmt.where(Document.source == source)
     
-    # Get total count
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar() or 0
+    # Get total count (optional, served from a short-lived cache)
+    total = None
+    if include_total:
+        total = document_count_cache.get(current_user.id, source)
+        if total is None:
+            count_stmt = select(func.count(Document.id)).where(Document.user_id == current_user.id)
+            if source:
+                count_stmt = count_stmt.where(Document.source == source)
+            total_result = await db.execute(count_stmt)
+            total = total_result.scalar() or 0
+            document_count_cache.set(current_user.id, source, total)
     
     # Get paginated documents
-    stmt = stmt.order_by(Document.created_at.desc()).offset(skip).limit(limit)
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        stmt = stmt.where(
+            tuple_(Document.created_at, Document.id) < tuple_(cursor_created_at, cursor_id)
+        )
+        skip = 0
+    
+    # Fetch one extra row to know whether another page exists
+    stmt = stmt.order_by(Document.created_at.desc(), Document.id.desc()).offset(skip).limit(limit + 1)
     result = await db.execute(stmt)
-    documents = result.scalars().all()
+    rows = result.all()
     
-    return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
-        "documents": [
-            {
-                "id": doc.id,
-                "filename": doc.filename,
-                "file_type": doc.file_type,
-                "file_size": doc.file_size,
-                "source": doc.source,
-                "s3_url": doc.s3_url,
-                "created_at": doc.created_at
-            }
-            for doc in documents
-        ]
-    }
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    documents = []
+    for row in rows:
+        summary = DocumentSummary.model_validate(row)
+        summary.s3_url = fresh_file_url(row.id, row.s3_key, row.file_type)
+        documents.append(summary)
+    
+    return DocumentPage(
+        total=total,
+        skip=skip,
+        limit=limit,
+        next_cursor=next_cursor,
+        has_more=has_more,
+        documents=documents
+    )
 
 # ============================================================================
 # GET SPECIFIC DOCUMENT
 # ============================================================================
 async def get_document_logic(
-    document_id: str,
+    document_id: uuid.UUID,
     db: AsyncSession,
     current_user: User
 ):
     """Get details of a specific document logic"""
-    stmt = select(Document).where(
+    stmt = select(*DETAIL_COLUMNS).where(
         Document.id == document_id,
         Document.user_id == current_user.id
     )
     result = await db.execute(stmt)
-    document = result.scalars().first()
+    row = result.first()
     
-    if not document:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    return {
-        "id": document.id,
-        "filename": document.filename,
-        "original_filename": document.original_filename,
-        "file_type": document.file_type,
-        "file_size": document.file_size,
-        "source": document.source,
-        "s3_url": document.s3_url,
-        "s3_key": document.s3_key,
-        "created_at": document.created_at,
-        "updated_at": document.updated_at
-    }
+    detail = DocumentDetail.model_validate(row)
+    detail.s3_url = fresh_file_url(row.id, row.s3_key, row.file_type)
+    return detail
 
 # ============================================================================
 # DELETE DOCUMENT
 # ============================================================================
 async def delete_document_logic(
-    document_id: str,
+    document_id: uuid.UUID,
     db: AsyncSession,
     current_user: User
 ):
@@ -197,8 +258,56 @@ async def delete_document_logic(
             detail="Document not found"
         )
     
+    # Delete stored bytes (best effort; the row is the source of truth)
+    try:
+        await object_store.delete(document.s3_key)
+    except Exception as e:
+        logger.warning(f"Failed to delete stored object {document.s3_key}: {e}")
+    
     # Delete from database
     await db.delete(document)
     await db.commit()
+    document_count_cache.invalidate(current_user.id)
+    
+    return None
+
+# ============================================================================
+# DOWNLOAD DOCUMENT
+# ============================================================================
+async def download_document_logic(
+    document_id: uuid.UUID,
+    db: AsyncSession,
+    current_user: User
+):
+    """Stream the stored bytes of a document logic"""
+    stmt = select(Document.s3_key, Document.original_filename).where(
+        Document.id == document_id,
+        Document.user_id == current_user.id
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
     
-    return None
\ No newline at end of file
+    media_type = mimetypes.guess_type(row.original_filename)[0] or "application/octet-stream"
+    
+    # Disk-backed stores hand the file to the server directly
+    local_path = object_store.local_path(row.s3_key)
+    if local_path:
+        return FileResponse(local_path, media_type=media_type, filename=row.original_filename)
+    
+    if not await object_store.exists(row.s3_key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document content not found"
+        )
+    
+    return StreamingResponse(
+        object_store.iter_chunks(row.s3_key),
+        media_type=media_type,
+        headers={"Content-Disposition": attachment_disposition(row.original_filename)}
+    )
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, timezone
+import asyncio
+import functools
 import logging
-import hashlib
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -12,13 +15,18 @@ from db.tables import User, Document, Analysis
 from core.database import get_db
 from core.auth import get_current_user
 from core.config import settings
+from core.file_validator import SCAN_UPLOAD_TYPES, validate_upload
+from core.metrics import PAYLOAD_BYTES, SCAN_STAGE_SECONDS
+from core.tracing import traced_commit
+from core.pagination import encode_cursor, decode_cursor, document_count_cache
+from models.document import ScanSummary, ScanHistoryPage
 
 # Local AI services
-from services.ocr import extract_text
-from services.pipeline import analyze_text
+from services.text_cache import text_cache_service
+from services.pipeline import analyze_pages, analyze_text, summarize_risks
 from services.data_collector import collector
+from services.object_store import object_store, ObjectNotFoundError
 from services.data_validator import validator
-from services.trainer import train_model as local_train_model
 
 # ============================================================================
 # SCAN DOCUMENT - Core AI Analysis Logic
@@ -39,42 +47,69 @@ async def scan_document_logic(
             detail="No file or text provided."
         )
     
+    started = time.perf_counter()
     try:
         # 1. Extraction
         file_content = None
         filename = None
         file_hash = None
+        extraction = {}
+        validated = started
         
         if file:
-            file_content = await file.read()
-            filename = file.filename
-            file_hash = hashlib.md5(file_content).hexdigest()
-            # Reset file pointer for extract_text
-            file.file.seek(0)
-            extracted_text = await extract_text(file=file)
+            upload = await validate_upload(file, SCAN_UPLOAD_TYPES, settings.max_file_size)
+            validated = time.perf_counter()
+            file_content = upload.content
+            filename = upload.filename
+            # One SHA-256 keys both the extracted-text cache and collected training data
+            file_hash = upload.sha256
             logger.info(f"User {current_user.email} scanning file: {filename}")
+
+            # 2. Local AI Pipeline Analysis, started on early pages while later ones extract
+            result = await analyze_pages(
+                text_cache_service.iter_pages(db, file_content, filename, extraction, file_hash=file_hash),
+                force_llm=force_llm,
+                filename=filename,
+                file_hash=file_hash
+            )
+            extracted_text = result["text"]
+            logger.debug(f"Extracted {filename} via {extraction.get('engine')} (cached={extraction.get('cached')})")
         else:
             extracted_text = text
             logger.info(f"User {current_user.email} scanning text input")
 
+            # 2. Local AI Pipeline Analysis
+            result = await analyze_text(
+                text=extracted_text,
+                force_llm=force_llm,
+                filename=filename,
+                file_hash=file_hash
+            )
+
         if not extracted_text:
              raise HTTPException(status_code=400, detail="Could not extract text for analysis.")
-
-        # 2. Local AI Pipeline Analysis
-        result = await analyze_text(
-            text=extracted_text,
-            force_llm=force_llm,
-            filename=filename,
-            file_hash=file_hash
-        )
         
         risks = result.get("data", [])
         source = result.get("source", "unknown")
+        summary = summarize_risks(risks)
+        analyzed = time.perf_counter()
         
         # 3. Persistence: Save scan record
         try:
             # Create a virtual document record for the scan
-            doc_id = str(uuid.uuid4())
+            doc_id = uuid.uuid4()
+            s3_key = f"scans/{current_user.id}/{doc_id}"
+            
+            # Keep the original bytes (or submitted text) for server-side re-scans
+            try:
+                if file_content is not None:
+                    await object_store.put(s3_key, file_content, upload.mime_type)
+                else:
+                    file_hash = text_cache_service.file_hash(text.encode())
+                    await object_store.put(s3_key, text.encode(), "text/plain")
+            except Exception as store_err:
+                logger.warning(f"Failed to store scan input {s3_key}: {store_err}")
+            
             new_doc = Document(
                 id=doc_id,
                 user_id=current_user.id,
@@ -82,37 +117,60 @@ async def scan_document_logic(
                 original_filename=filename or "direct_text_input",
                 file_type="pdf" if (filename and filename.endswith('.pdf')) else "docx" if (filename and filename.endswith('.docx')) else "text",
                 file_size=len(file_content) if file_content else (len(text.encode()) if text else 0),
-                s3_key=f"scans/{current_user.id}/{doc_id}", # Placeholder key
-                source="file_picker" if file else "text_input"
+                s3_key=s3_key,
+                sha256=file_hash,
+                source="file_picker" if file else "text_input",
+                risk_count=summary["risk_count"],
+                risk_categories=summary["risk_categories"],
+                analysis_source=source,
+                analyzed_at=datetime.now(timezone.utc)
             )
             db.add(new_doc)
             
             # Save Analysis results
             analysis = Analysis(
-                id=str(uuid.uuid4()),
+                id=uuid.uuid4(),
                 document_id=doc_id,
                 data=risks,
                 source=source
             )
             db.add(analysis)
-            await db.commit()
-            scan_id = doc_id
+            with traced_commit("scan"):
+                await db.commit()
+            document_count_cache.invalidate(current_user.id)
+            scan_id = str(doc_id)
         except Exception as db_err:
             logger.error(f"Failed to save scan results to DB: {db_err}")
             await db.rollback()
             scan_id = None
+        persisted = time.perf_counter()
 
         # 4. Formulate Response
-        return {
+        response = {
             "scan_id": scan_id,
             "user_id": str(current_user.id),
             "timestamp": datetime.utcnow().isoformat(),
             "filename": filename or "Text Scan",
             "source": source,
+            "routing": result.get("routing"),
             "risks": risks,
-            "risk_count": len(risks),
-            "categories": list(set(r.get("category", "Other") for r in risks))
+            "risk_count": summary["risk_count"],
+            "categories": summary["risk_categories"]
         }
+        # Extraction overlaps analysis for files, so its own time comes from the extractor
+        if "duration_ms" in extraction:
+            SCAN_STAGE_SECONDS.labels(stage="extraction", source=source).observe(extraction["duration_ms"] / 1000)
+        if file_content is not None:
+            SCAN_STAGE_SECONDS.labels(stage="validation", source=source).observe(validated - started)
+        SCAN_STAGE_SECONDS.labels(stage="analysis", source=source).observe(analyzed - validated)
+        SCAN_STAGE_SECONDS.labels(stage="persistence", source=source).observe(persisted - analyzed)
+        SCAN_STAGE_SECONDS.labels(stage="response", source=source).observe(time.perf_counter() - persisted)
+        SCAN_STAGE_SECONDS.labels(stage="total", source=source).observe(time.perf_counter() - started)
+        if file_content is not None:
+            PAYLOAD_BYTES.labels(kind="file", source=source).observe(len(file_content))
+        else:
+            PAYLOAD_BYTES.labels(kind="text", source=source).observe(len(text.encode()))
+        return response
         
     except HTTPException:
         raise
@@ -123,6 +181,159 @@ async def scan_document_logic(
             detail=f"An error occurred during analysis: {str(e)}"
         )
 
+# ============================================================================
+# RE-SCAN - Re-run analysis on a stored document without re-upload
+# ============================================================================
+async def rescan_document_logic(
+    document_id: uuid.UUID,
+    force_llm: bool,
+    db: AsyncSession,
+    current_user: User
+):
+    """
+    Re-analyze an existing document from its stored bytes.
+
+    The extracted-text cache is checked by the document's sha256 first, so
+    the stored object is only fetched when its text has to be extracted
+    again. A new Analysis row is appended (earlier results are kept) and the
+    document's materialized summary is moved to the new result.
+    """
+    stmt = select(Document).where(
+        Document.id == document_id,
+        Document.user_id == current_user.id
+    )
+    document = (await db.execute(stmt)).scalars().first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    logger.info(f"User {current_user.email} re-scanning document: {document.id}")
+    extraction = {}
+    try:
+        if document.sha256 is None:
+            # Stored before the hash was recorded: fetch once and remember it
+            content = await object_store.get(document.s3_key)
+            document.sha256 = text_cache_service.file_hash(content)
+        else:
+            content = functools.partial(object_store.get, document.s3_key)
+        result = await analyze_pages(
+            text_cache_service.iter_pages(db, content, document.original_filename, extraction, file_hash=document.sha256),
+            force_llm=force_llm,
+            filename=document.original_filename,
+            file_hash=document.sha256
+        )
+    except ObjectNotFoundError:
+        raise HTTPException(
+            status_code=409,
+            detail="Stored content for this document is unavailable. Please upload it again."
+        )
+    if not result["text"]:
+        raise HTTPException(status_code=400, detail="Could not extract text for analysis.")
+    risks = result.get("data", [])
+    source = result.get("source", "unknown")
+    summary = summarize_risks(risks)
+
+    analysis_id = uuid.uuid4()
+    db.add(Analysis(
+        id=analysis_id,
+        document_id=document.id,
+        data=risks,
+        source=source
+    ))
+    document.risk_count = summary["risk_count"]
+    document.risk_categories = summary["risk_categories"]
+    document.analysis_source = source
+    document.analyzed_at = datetime.now(timezone.utc)
+    with traced_commit("rescan"):
+        await db.commit()
+
+    return {
+        "scan_id": str(document.id),
+        "analysis_id": str(analysis_id),
+        "user_id": str(current_user.id),
+        "timestamp": datetime.utcnow().isoformat(),
+        "filename": document.filename,
+        "source": source,
+        "routing": result.get("routing"),
+        "risks": risks,
+        "risk_count": summary["risk_count"],
+        "categories": summary["risk_categories"]
+    }
+
+# ============================================================================
+# SCAN HISTORY - Documents with their latest analysis summary
+# ============================================================================
+HISTORY_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.file_type,
+    Document.source,
+    Document.created_at,
+    Document.risk_count,
+    Document.risk_categories,
+    Document.analysis_source,
+    Document.analyzed_at,
+)
+
+async def scan_history_logic(
+    limit: int,
+    cursor: Optional[str],
+    db: AsyncSession,
+    current_user: User
+):
+    """
+    List scanned documents newest first with their latest analysis summary.
+
+    The summary is read from columns materialized at scan time, so a page is
+    one keyset query over documents. Documents scanned before those columns
+    existed are summarized from their latest Analysis in one batched query.
+    """
+    stmt = select(*HISTORY_COLUMNS).where(Document.user_id == current_user.id)
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        stmt = stmt.where(
+            tuple_(Document.created_at, Document.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    stmt = stmt.order_by(Document.created_at.desc(), Document.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    scans = [ScanSummary.model_validate(row) for row in rows]
+
+    # Backfill legacy rows (no materialized summary) from their latest analysis
+    missing = {scan.id: scan for scan in scans if scan.risk_count is None}
+    if missing:
+        analyses = await db.execute(
+            select(Analysis.document_id, Analysis.data, Analysis.source, Analysis.created_at)
+            .where(Analysis.document_id.in_(list(missing)))
+            .order_by(Analysis.document_id, Analysis.created_at.desc())
+        )
+        seen = set()
+        for analysis in analyses.all():
+            if analysis.document_id in seen:
+                continue
+            seen.add(analysis.document_id)
+            scan = missing[analysis.document_id]
+            summary = summarize_risks(analysis.data or [])
+            scan.risk_count = summary["risk_count"]
+            scan.risk_categories = summary["risk_categories"]
+            scan.analysis_source = analysis.source
+            scan.analyzed_at = analysis.created_at
+
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return ScanHistoryPage(
+        limit=limit,
+        next_cursor=next_cursor,
+        has_more=has_more,
+        scans=scans
+    )
+
 # ============================================================================
 # AI INFRASTRUCTURE & DATA MANAGEMENT
 # ============================================================================
@@ -144,9 +355,16 @@ async def validate_data_logic():
 
 async def train_logic():
     """Train local model using collected data."""
+    # Training imports scikit-learn; keep it out of the request path until needed
+    from services.trainer import train_model as local_train_model
     acc, f1 = local_train_model()
     return {
         "accuracy": acc, 
         "f1_micro": f1, 
         "meets_target": acc >= settings.accuracy_target
     }
+
+async def learn_logic():
+    """Fold newly collected samples into the local model (hashing mode only)."""
+    from services.online_learner import online_learner
+    return await asyncio.to_thread(online_learner.run_once)
@@ -2,14 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-import boto3
 from datetime import datetime
 import uuid
 
 from core.database import get_db
 from core.auth import get_current_user, get_password_hash, verify_password
 from core.config import settings
+from core.file_validator import PROFILE_PICTURE_TYPES, validate_upload
 from db.tables import User
+from services.storage import storage_service
 
 # ============================================================================
 # GET USER PROFILE
@@ -104,45 +105,20 @@ async def upload_profile_picture_logic(
     """
     Upload user profile picture logic
     """
-    # Validate it's an image
-    if not file.content_type or not file.content_type.startswith('image/'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image (JPG, PNG, GIF)"
-        )
-    
-    # Read content
-    content = await file.read()
-    
-    # Validate size (max 2MB for profile pictures)
-    max_size = 2 * 1024 * 1024
-    if len(content) > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"Image too large. Maximum size is {max_size / (1024*1024)}MB"
-        )
-    
-    # Initialize S3 client
-    s3_client = boto3.client(
-        's3',
-        endpoint_url=settings.s3_endpoint_url,
-        aws_access_key_id=settings.s3_access_key_id,
-        aws_secret_access_key=settings.s3_secret_access_key,
-        region_name=settings.s3_region
-    )
+    # Validate it's a real image (JPG, PNG, GIF) of at most 2MB
+    upload = await validate_upload(file, PROFILE_PICTURE_TYPES, 2 * 1024 * 1024, keep_content=False)
     
     # Generate S3 key
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
     s3_key = f"profiles/{current_user.id}/avatar_{timestamp}.{file_extension}"
     
-    # Upload to S3
+    # Upload to S3 through the shared client, streaming the spooled file
     try:
-        s3_client.put_object(
-            Bucket=settings.s3_bucket_name,
-            Key=s3_key,
-            Body=content,
-            ContentType=file.content_type
+        await storage_service.upload_fileobj(
+            file.file,
+            s3_key,
+            {"ContentType": upload.mime_type}
         )
     except Exception as e:
         raise HTTPException(
@@ -1,63 +1,220 @@
-import magic
+import asyncio
 import hashlib
-from fastapi import HTTPException, status
-from typing import Tuple
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+import magic
+from fastapi import HTTPException, UploadFile, status
+
+# libmagic only needs the leading bytes to identify every type we accept
+SNIFF_BYTES = 4096
+INSPECT_CHUNK_SIZE = 1024 * 1024
+
+SUSPICIOUS_PATTERNS = (
+    b'<script',  # JavaScript in files
+    b'eval(',     # Eval in files
+    b'system(',   # System calls
+    b'exec(',     # Exec calls
+)
+SUSPICIOUS_RE = re.compile(b"|".join(re.escape(p) for p in SUSPICIOUS_PATTERNS), re.IGNORECASE)
+# Chunks overlap by this much so a pattern split across a boundary is still found
+_PATTERN_OVERLAP = max(len(p) for p in SUSPICIOUS_PATTERNS) - 1
+
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Sniffed MIME type -> accepted filename extensions (empty: any extension;
+# "" accepts a filename without one)
+DOCUMENT_UPLOAD_TYPES: Dict[str, Tuple[str, ...]] = {
+    'application/pdf': ('.pdf',),
+    DOCX_MIME: ('.docx',),
+    'application/zip': ('.docx',),  # DOCX is a zip file
+    'image/jpeg': ('.jpg', '.jpeg'),
+    'image/png': ('.png',),
+}
+SCAN_UPLOAD_TYPES: Dict[str, Tuple[str, ...]] = {
+    **DOCUMENT_UPLOAD_TYPES,
+    'image/bmp': ('.bmp',),
+    'image/tiff': ('.tiff',),
+    'text/plain': ('.txt', ''),
+}
+PROFILE_PICTURE_TYPES: Dict[str, Tuple[str, ...]] = {
+    'image/jpeg': (),
+    'image/png': (),
+    'image/gif': (),
+}
+
+
+@lru_cache(maxsize=1)
+def _mime_detector() -> magic.Magic:
+    """Process-wide libmagic handle; loading the magic database is the expensive part"""
+    return magic.Magic(mime=True)
+
+
+def sniff_mime_type(content: bytes) -> str:
+    """Detect the MIME type from the header bytes only"""
+    try:
+        return _mime_detector().from_buffer(bytes(memoryview(content)[:SNIFF_BYTES]))
+    except Exception:
+        return "unknown"
+
+
+@dataclass(frozen=True)
+class ContentInspection:
+    sha256: str
+    suspicious: bool
+    size: int
+
+
+def _inspect_chunks(chunks: Iterable) -> ContentInspection:
+    """
+    Hash the chunks and scan them for suspicious patterns in a single pass.
+    Only the last few bytes of each chunk are copied, to catch a pattern
+    split across a boundary.
+    """
+    digest = hashlib.sha256()
+    suspicious = False
+    size = 0
+    tail = b""
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+        if not suspicious:
+            suspicious = (
+                SUSPICIOUS_RE.search(tail + bytes(chunk[:_PATTERN_OVERLAP])) is not None
+                or SUSPICIOUS_RE.search(chunk) is not None
+            )
+            tail = bytes(chunk[-_PATTERN_OVERLAP:])
+    return ContentInspection(sha256=digest.hexdigest(), suspicious=suspicious, size=size)
+
+
+def inspect_content(content: bytes) -> ContentInspection:
+    """Hash and pattern-scan in-memory content chunk by chunk over a memoryview, without copying it"""
+    view = memoryview(content)
+    return _inspect_chunks(view[offset:offset + INSPECT_CHUNK_SIZE] for offset in range(0, len(view), INSPECT_CHUNK_SIZE))
+
+
+def inspect_stream(stream: BinaryIO) -> ContentInspection:
+    """Hash and pattern-scan a file object from its current position, one INSPECT_CHUNK_SIZE read at a time"""
+    return _inspect_chunks(iter(lambda: stream.read(INSPECT_CHUNK_SIZE), b""))
+
+
+@dataclass(frozen=True)
+class ValidatedUpload:
+    content: Optional[bytes]  # None when validated with keep_content=False
+    filename: str
+    mime_type: str
+    size: int
+    sha256: str
+
+
+async def validate_upload(
+    file: UploadFile,
+    allowed_types: Dict[str, Tuple[str, ...]],
+    max_size: int,
+    keep_content: bool = True
+) -> ValidatedUpload:
+    """
+    The validation stage every upload route goes through: size limit, magic
+    byte sniffing against `allowed_types`, filename extension consistency,
+    and the hash + malicious pattern pass. Raises HTTPException on rejection.
+
+    Routes that only store the file pass keep_content=False: just the first
+    SNIFF_BYTES are read into memory, the spooled upload is hashed and
+    scanned chunk by chunk, and `file` is rewound so the caller can stream
+    `file.file` to storage.
+    """
+    max_mb = max_size / (1024 * 1024)
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size is {max_mb}MB"
+    )
+    if file.size is not None and file.size > max_size:
+        raise too_large
+    content = await file.read() if keep_content else None
+    header = content if keep_content else await file.read(SNIFF_BYTES)
+    if keep_content and len(content) > max_size:
+        raise too_large
+    if not header:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is empty"
+        )
+
+    mime_type = sniff_mime_type(header)
+    if mime_type not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content type '{mime_type}' is not allowed"
+        )
+    filename = file.filename or ""
+    extensions = allowed_types[mime_type]
+    if extensions and os.path.splitext(filename.lower())[1] not in extensions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File extension does not match its content"
+        )
+
+    if keep_content:
+        inspection = await asyncio.to_thread(inspect_content, content)
+    else:
+        await file.seek(0)
+        inspection = await asyncio.to_thread(inspect_stream, file.file)
+        await file.seek(0)
+        if inspection.size > max_size:
+            raise too_large
+    if inspection.suspicious:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File contains potentially malicious content"
+        )
+    return ValidatedUpload(
+        content=content,
+        filename=filename,
+        mime_type=mime_type,
+        size=inspection.size,
+        sha256=inspection.sha256
+    )
+
 
 def validate_file_content(content: bytes, declared_type: str) -> Tuple[bool, str]:
     """
     Validate file content matches declared MIME type
     Prevents malicious files disguised as safe types
-    
+
     Returns: (is_valid, actual_mime_type)
     """
-    try:
-        # Use python-magic to detect actual file type
-        mime = magic.Magic(mime=True)
-        actual_mime_type = mime.from_buffer(content)
-        
-        # Map of allowed declared types to actual types
-        allowed_mappings = {
-            'application/pdf': ['application/pdf'],
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': [
-                'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                'application/zip'  # DOCX is a zip file
-            ],
-            'image/jpeg': ['image/jpeg'],
-            'image/jpg': ['image/jpeg'],
-            'image/png': ['image/png']
-        }
-        
-        # Check if actual type matches declared type
-        if declared_type in allowed_mappings:
-            if actual_mime_type in allowed_mappings[declared_type]:
-                return True, actual_mime_type
-        
-        return False, actual_mime_type
-        
-    except Exception as e:
-        # If validation fails, reject the file
-        return False, "unknown"
+    actual_mime_type = sniff_mime_type(content)
+
+    # Map of allowed declared types to actual types
+    allowed_mappings = {
+        'application/pdf': ['application/pdf'],
+        DOCX_MIME: [
+            DOCX_MIME,
+            'application/zip'  # DOCX is a zip file
+        ],
+        'image/jpeg': ['image/jpeg'],
+        'image/jpg': ['image/jpeg'],
+        'image/png': ['image/png']
+    }
+
+    # Check if actual type matches declared type
+    if declared_type in allowed_mappings:
+        if actual_mime_type in allowed_mappings[declared_type]:
+            return True, actual_mime_type
+
+    return False, actual_mime_type
 
 def calculate_file_hash(content: bytes) -> str:
     """Calculate SHA-256 hash of file content"""
     return hashlib.sha256(content).hexdigest()
 
+
 def scan_for_malicious_content(content: bytes) -> bool:
     """
     Basic malicious content detection
     Check for common malware signatures
     """
-    # List of suspicious patterns (basic example)
-    suspicious_patterns = [
-        b'<script',  # JavaScript in files
-        b'eval(',     # Eval in files
-        b'system(',   # System calls
-        b'exec(',     # Exec calls
-    ]
-    
-    content_lower = content.lower()
-    for pattern in suspicious_patterns:
-        if pattern in content_lower:
-            return True
-    
-    return False
\ No newline at end of file
+    return inspect_content(content).suspicious
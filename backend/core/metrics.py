@@ -0,0 +1,69 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Prometheus metrics for the scan pipeline, exposed on GET /metrics.
+# Everything here is process-local; with several uvicorn workers each one
+# reports its own series.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KB .. 64 MB
+
+SCAN_STAGE_SECONDS = Histogram(
+    "haniphei_scan_stage_seconds",
+    "Wall time of each scan stage (extraction, analysis, persistence, response, total)",
+    ["stage", "source"],
+    buckets=LATENCY_BUCKETS,
+)
+OCR_PAGE_SECONDS = Histogram(
+    "haniphei_ocr_page_seconds",
+    "Tesseract time per OCR'd page, including preprocessing",
+    ["kind"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "haniphei_llm_request_seconds",
+    "Latency of a single LLM provider call",
+    ["provider", "model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_INFERENCE_SECONDS = Histogram(
+    "haniphei_model_inference_seconds",
+    "Local model prediction time per call",
+    buckets=FAST_BUCKETS,
+)
+DB_COMMIT_SECONDS = Histogram(
+    "haniphei_db_commit_seconds",
+    "Time spent in db.commit() by operation",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+QUEUE_DEPTH = Gauge(
+    "haniphei_queue_depth",
+    "Items waiting in in-process queues (prefetched pages, analysis chunks in flight)",
+    ["queue"],
+)
+ROUTING_DECISIONS = Counter(
+    "haniphei_routing_decisions_total",
+    "Analyses answered by the local model or sent to the LLM, by route and reason",
+    ["route", "reason"],
+)
+CACHE_REQUESTS = Counter(
+    "haniphei_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss); hit rate = hit / total",
+    ["cache", "result"],
+)
+PAYLOAD_BYTES = Histogram(
+    "haniphei_payload_bytes",
+    "Size of scanned inputs in bytes",
+    ["kind", "source"],
+    buckets=SIZE_BUCKETS,
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_metrics():
+    """Prometheus text exposition of the default registry: (body, content type)"""
+    return generate_latest(), CONTENT_TYPE_LATEST
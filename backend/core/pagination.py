@@ -0,0 +1,72 @@
+import base64
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from core.metrics import record_cache
+
+# Short-lived total counts so paging through a large library does not
+# re-run COUNT(*) for every page (use Redis in production)
+COUNT_CACHE_TTL_SECONDS = 30
+COUNT_CACHE_MAX_ENTRIES = 10_000
+
+
+def encode_cursor(created_at: datetime, document_id) -> str:
+    """
+    Encode the keyset position (created_at, id) of the last row on a page
+    Returns: opaque url-safe token for the next page
+    """
+    raw = f"{created_at.isoformat()}|{document_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+    Raises: ValueError if the token is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, document_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(document_id)
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+class CountCache:
+    """In-memory TTL cache of per-user document totals; LRU-bounded"""
+
+    def __init__(self, ttl_seconds: int = COUNT_CACHE_TTL_SECONDS, max_entries: int = COUNT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._store: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, int]]" = OrderedDict()
+
+    def get(self, user_id, source: Optional[str] = None) -> Optional[int]:
+        key = (str(user_id), source)
+        entry = self._store.get(key)
+        if entry and time.monotonic() - entry[0] > self.ttl_seconds:
+            self._store.pop(key, None)
+            entry = None
+        elif entry:
+            self._store.move_to_end(key)
+        record_cache("document_count", entry is not None)
+        return entry[1] if entry else None
+
+    def set(self, user_id, source: Optional[str], total: int) -> None:
+        key = (str(user_id), source)
+        self._store[key] = (time.monotonic(), total)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def invalidate(self, user_id) -> None:
+        """Drop every cached total for a user (call after insert/delete)"""
+        user_key = str(user_id)
+        for key in [k for k in self._store if k[0] == user_key]:
+            self._store.pop(key, None)
+
+
+document_count_cache = CountCache()
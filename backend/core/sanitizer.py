@@ -1,4 +1,5 @@
 import re
+from urllib.parse import quote
 from fastapi import HTTPException, status
 
 def sanitize_filename(filename: str) -> str:
@@ -25,6 +26,15 @@ def sanitize_filename(filename: str) -> str:
     
     return filename
 
+def attachment_disposition(filename: str) -> str:
+    """
+    Content-Disposition header for a download. filename* (RFC 5987) carries
+    the real name, e.g. Khmer; filename= is an ASCII fallback for clients that
+    ignore it. Headers are latin-1, so the raw name never goes in unencoded.
+    """
+    fallback = re.sub(r'[^\x20-\x7e]|["\\]', '_', filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=utf-8''{quote(filename, safe='')}"
+
 def validate_source_parameter(source: str) -> bool:
     """Validate source parameter is one of allowed values"""
     allowed_sources = ['camera', 'file_picker', 'gallery']
@@ -0,0 +1,118 @@
+import logging
+import os
+import sys
+from contextlib import contextmanager
+
+from fastapi import FastAPI, Request
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+from core.metrics import DB_COMMIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Spans are no-ops until setup_tracing installs an SDK provider, so
+# instrumented code costs next to nothing when tracing is off.
+tracer = trace.get_tracer("haniphei")
+
+
+def _span_line(span) -> str:
+    return span.to_json(indent=None) + os.linesep
+
+
+def setup_tracing(app: FastAPI, engine: AsyncEngine) -> bool:
+    """
+    Install the tracer provider, request middleware and SQLAlchemy hooks.
+    settings.tracing_exporter picks a local exporter: "console" writes spans
+    to stdout, "file" appends one JSON span per line to settings.tracing_file.
+    Spans use the standard OpenTelemetry model, so an OTLP exporter can be
+    swapped in later without touching the instrumented code.
+    """
+    exporter_name = (settings.tracing_exporter or "").lower()
+    if exporter_name not in ("console", "file"):
+        return False
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter_name == "file":
+        os.makedirs(os.path.dirname(os.path.abspath(settings.tracing_file)), exist_ok=True)
+        out = open(settings.tracing_file, "a", encoding="utf-8")
+    else:
+        out = sys.stdout
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing_service_name}))
+    provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(out=out, formatter=_span_line)))
+    trace.set_tracer_provider(provider)
+
+    app.middleware("http")(trace_requests)
+    instrument_engine(engine)
+    logger.info(f"Tracing enabled ({exporter_name} exporter)")
+    return True
+
+
+async def trace_requests(request: Request, call_next):
+    """Server span per request, continuing an incoming W3C traceparent if present."""
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}",
+        context=propagate.extract(request.headers),
+        kind=SpanKind.SERVER,
+    ) as span:
+        span.set_attribute("http.request.method", request.method)
+        span.set_attribute("url.path", request.url.path)
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            span.update_name(f"{request.method} {route.path}")
+            span.set_attribute("http.route", route.path)
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_status(Status(StatusCode.ERROR))
+        return response
+
+
+@contextmanager
+def traced_commit(operation: str):
+    """Span plus commit-time histogram around a db.commit() (COMMIT never reaches a cursor)."""
+    with tracer.start_as_current_span("db.commit", attributes={"db.operation.name": operation}):
+        with DB_COMMIT_SECONDS.labels(operation=operation).time():
+            yield
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Client span around every statement executed through the engine."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": sync_engine.dialect.name,
+                "db.statement": statement[:1000],
+            },
+        )
+        context._otel_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_otel_span", None)
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+            context._otel_span = None
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_otel_span", None) if context is not None else None
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+            context._otel_span = None
@@ -1,3 +1,3 @@
-from db.tables import Base, User, Document, Analysis
+from db.tables import Base, User, Document, Analysis, ExtractedText
 
-__all__ = ["Base", "User", "Document", "Analysis"]
+__all__ = ["Base", "User", "Document", "Analysis", "ExtractedText"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, BigInteger
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, JSON, BigInteger, Index, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -47,13 +47,25 @@ class Document(Base):
     file_size = Column(BigInteger, nullable=False)
     s3_key = Column(String(500), nullable=False)
     s3_url = Column(Text, nullable=True)
+    # SHA-256 of the stored bytes; keys the extracted-text cache for re-scans
+    sha256 = Column(String(64), nullable=True)
     source = Column(String, server_default="file_picker") 
+    # Materialized summary of the latest analysis, written at scan time
+    risk_count = Column(Integer, nullable=True)
+    risk_categories = Column(JSON, nullable=True)
+    analysis_source = Column(String(50), nullable=True)
+    analyzed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="documents")
     analyses = relationship("Analysis", back_populates="document", cascade="all, delete-orphan")
 
+    # Backs keyset pagination: WHERE user_id = ? AND (created_at, id) < (?, ?)
+    __table_args__ = (
+        Index("ix_documents_user_created_id", user_id, created_at.desc(), id.desc()),
+    )
+
 
 class Analysis(Base):
     __tablename__ = "analyses"
@@ -65,4 +77,22 @@ class Analysis(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     document = relationship("Document", back_populates="analyses")
-    
\ No newline at end of file
+    
+
+
+class ExtractedText(Base):
+    __tablename__ = "extracted_texts"
+
+    # SHA-256 of the uploaded bytes; identical files share one extraction
+    file_hash = Column(String(64), primary_key=True)
+    extractor_version = Column(Integer, nullable=False)
+    # Extractor version plus the OCR settings the text was produced with
+    extractor_fingerprint = Column(String(16), nullable=True)
+    text_zlib = Column(LargeBinary, nullable=False)
+    text_length = Column(Integer, nullable=False)
+    engine = Column(String(50), nullable=False)
+    language = Column(String(50), nullable=True)
+    page_count = Column(Integer, nullable=False, server_default="1")
+    pages_ocr = Column(Integer, nullable=False, server_default="0")
+    duration_ms = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
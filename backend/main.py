@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 
@@ -5,14 +6,16 @@ print(">>> BACKEND STARTUP INITIATED")
 print(f">>> ENV PORT: {os.getenv('PORT')}")
 sys.stdout.flush()
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from scalar_fastapi import get_scalar_api_reference
 
 from routers import scan, documents, auth, user
 from core.config import settings
-from core.database import init_db
+from core.metrics import render_metrics
+from core.tracing import setup_tracing
+from core.database import engine, init_db
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,7 +31,13 @@ async def lifespan(app: FastAPI):
         logger.warning(f"⚠️  Database initialization failed: {e}")
         logger.warning("⚠️  Running without database - authentication features will not work")
         logger.warning("⚠️  AI service integration will still work for testing")
+    learner_task = None
+    if settings.learner_interval_seconds > 0:
+        from services.online_learner import online_learner
+        learner_task = asyncio.create_task(online_learner.run_forever())
     yield
+    if learner_task is not None:
+        learner_task.cancel()
 
 
 app = FastAPI(
@@ -51,6 +60,9 @@ app.add_middleware(
 )
 print("CORS origins:", settings.cors_origins)
 
+# Request/OCR/LLM/DB spans to a local console or JSON-lines file exporter
+setup_tracing(app, engine)
+
 app.include_router(auth.router, prefix="/api/auth")
 app.include_router(scan.router, prefix="/api")
 app.include_router(documents.router, prefix="/api")
@@ -78,6 +90,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+if settings.metrics_enabled:
+    @app.get("/metrics", tags=["health"], include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+
 @app.get("/docs", include_in_schema=False)
 async def scalar_html():
     return get_scalar_api_reference(
@@ -51,3 +51,59 @@ class DocumentWithAnalysis(DocumentResponse):
 
     class Config:
         from_attributes = True
+
+
+class DocumentSummary(BaseModel):
+    """Projection of the columns shown in document listings"""
+    id: UUID
+    filename: str
+    file_type: str
+    file_size: int
+    source: Optional[str] = None
+    s3_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DocumentDetail(DocumentSummary):
+    original_filename: str
+    s3_key: str
+    updated_at: Optional[datetime] = None
+    risk_count: Optional[int] = None
+    risk_categories: Optional[List[str]] = None
+    analysis_source: Optional[str] = None
+    analyzed_at: Optional[datetime] = None
+
+
+class DocumentPage(BaseModel):
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+    has_more: bool
+    documents: List[DocumentSummary]
+
+
+class ScanSummary(BaseModel):
+    """A scanned document with the summary of its latest analysis"""
+    id: UUID
+    filename: str
+    file_type: str
+    source: Optional[str] = None
+    created_at: Optional[datetime] = None
+    risk_count: Optional[int] = None
+    risk_categories: Optional[List[str]] = None
+    analysis_source: Optional[str] = None
+    analyzed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ScanHistoryPage(BaseModel):
+    limit: int
+    next_cursor: Optional[str] = None
+    has_more: bool
+    scans: List[ScanSummary]
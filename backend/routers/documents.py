@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 
 from core.database import get_db
 from core.auth import get_current_user
 from db.tables import User
+from models.document import DocumentDetail, DocumentPage
 from core.rate_limit import upload_rate_limit
 from controllers.document import (
     upload_document_logic,
     list_documents_logic,
     get_document_logic,
+    download_document_logic,
     delete_document_logic
 )
 
@@ -26,29 +29,43 @@ async def upload_document(
     """Upload a document file."""
     return await upload_document_logic(request, file, source, db, current_user)
 
-@router.get("")
+@router.get("", response_model=DocumentPage)
 async def list_documents(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     source: str = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True, description="Set false to skip the total count"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all documents for current user."""
-    return await list_documents_logic(skip, limit, source, db, current_user)
+    return await list_documents_logic(
+        skip, limit, source, db, current_user,
+        cursor=cursor, include_total=include_total
+    )
 
-@router.get("/{document_id}")
+@router.get("/{document_id}", response_model=DocumentDetail)
 async def get_document(
-    document_id: str,
+    document_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get specific document details."""
     return await get_document_logic(document_id, db, current_user)
 
+@router.get("/{document_id}/download")
+async def download_document(
+    document_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download the stored document file."""
+    return await download_document_logic(document_id, db, current_user)
+
 @router.delete("/{document_id}", status_code=204)
 async def delete_document(
-    document_id: str,
+    document_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, File, UploadFile, Form, Depends
+from fastapi import APIRouter, File, UploadFile, Form, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from uuid import UUID
 
 from core.database import get_db
 from core.auth import get_current_user
 from db.tables import User
+from models.document import ScanHistoryPage
 from controllers.scan import (
     scan_document_logic,
+    scan_history_logic,
+    rescan_document_logic,
     ai_health_logic,
     data_statistics_logic,
     validate_data_logic,
-    train_logic
+    train_logic,
+    learn_logic
 )
 
 router = APIRouter(tags=["AI Analysis"])
@@ -26,6 +31,26 @@ async def scan_document(
     """Analyze document or text for hidden risks locally in the backend."""
     return await scan_document_logic(file, text, force_llm, db, current_user)
 
+@router.get("/scan/history", response_model=ScanHistoryPage)
+async def scan_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List past scans with their latest risk summary."""
+    return await scan_history_logic(limit, cursor, db, current_user)
+
+@router.post("/scan/{document_id}/rescan")
+async def rescan_document(
+    document_id: UUID,
+    force_llm: Optional[bool] = Form(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Re-run analysis on a stored document without re-uploading it."""
+    return await rescan_document_logic(document_id, force_llm, db, current_user)
+
 @router.get("/ai/health")
 async def ai_health():
     """Verify built-in AI capabilities are responsive."""
@@ -45,3 +70,8 @@ async def validate_data():
 async def train():
     """Train local model using collected data."""
     return await train_logic()
+
+@router.post("/ai/learn")
+async def learn():
+    """Incrementally update the local model with newly collected data."""
+    return await learn_logic()
@@ -1,9 +1,11 @@
 from services.auth import auth_service
 from services.document import document_service
 from services.storage import storage_service
+from services.object_store import object_store
 
 __all__ = [
     "auth_service",
     "document_service", 
     "storage_service",
+    "object_store",
 ]
@@ -9,8 +9,12 @@ from collections import Counter
 # Support both package and module execution
 try:
     from ..core.config import settings
+    from ..core.tracing import tracer
+    from .language_profile import merge_profiles, profile_segments, profile_text, segment_summary
 except ImportError:
     from core.config import settings
+    from core.tracing import tracer
+    from services.language_profile import merge_profiles, profile_segments, profile_text, segment_summary
 
 DOCUMENT_TYPE_PATTERNS = {
     "construction_contract": [
@@ -62,6 +66,7 @@ class DataCollector:
         self.metadata_file = os.path.join(self.data_dir, "metadata.jsonl")
         self.dedup_file = os.path.join(self.data_dir, "dedup_hashes.txt")
         os.makedirs(self.data_dir, exist_ok=True)
+    @tracer.start_as_current_span("collector.collect")
     def collect(
         self,
         text: str,
@@ -79,7 +84,8 @@ class DataCollector:
             return False
         features = self._extract_features(text)
         doc_type = self._classify_document_type(text)
-        language_info = self._detect_language(text)
+        segments = profile_segments(text)
+        language_info = merge_profiles(segments).as_dict()
         labels = sorted({r.get("category", "Other") for r in risks})
         training_record = {
             "text": text,
@@ -97,6 +103,7 @@ class DataCollector:
             "language_mix": language_info["is_mixed"],
             "khmer_ratio": language_info["khmer_ratio"],
             "english_ratio": language_info["english_ratio"],
+            "language_segments": segment_summary(segments),
             "features": features,
             "labels": labels,
             "risk_count": len(risks),
@@ -126,31 +133,7 @@ class DataCollector:
             existing_hashes = set(line.strip() for line in f)
         return text_hash in existing_hashes
     def _detect_language(self, text: str) -> Dict:
-        khmer_chars = len(re.findall(r'[\u1780-\u17FF]', text))
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        total_chars = khmer_chars + english_chars
-        if total_chars == 0:
-            return {
-                "primary_language": "unknown",
-                "is_mixed": False,
-                "khmer_ratio": 0.0,
-                "english_ratio": 0.0,
-            }
-        khmer_ratio = khmer_chars / total_chars
-        english_ratio = english_chars / total_chars
-        if khmer_ratio > 0.7:
-            primary = "khmer"
-        elif english_ratio > 0.7:
-            primary = "english"
-        else:
-            primary = "mixed"
-        is_mixed = khmer_ratio > 0.15 and english_ratio > 0.15
-        return {
-            "primary_language": primary,
-            "is_mixed": is_mixed,
-            "khmer_ratio": round(khmer_ratio, 3),
-            "english_ratio": round(english_ratio, 3),
-        }
+        return profile_text(text).as_dict()
     def _classify_document_type(self, text: str) -> str:
         text_lower = text.lower()
         scores = {}
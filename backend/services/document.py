@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Tuple
 from uuid import UUID
@@ -8,6 +8,7 @@ import os
 from db.tables import User, Document
 from services.storage import storage_service
 from core.config import settings
+from core.pagination import document_count_cache
 
 
 class DocumentService:
@@ -58,7 +59,8 @@ class DocumentService:
         self.validate_file_size(file_size)
 
         # Upload to storage
-        s3_key, s3_url = await self.storage_service.upload_file(
+        # The presigned URL is not persisted: it expires and is re-issued on read
+        s3_key, _ = await self.storage_service.upload_file(
             file_content=file_content,
             user_id=str(user.id),
             filename=filename,
@@ -72,13 +74,13 @@ class DocumentService:
             original_filename=filename,
             file_type=content_type,
             file_size=file_size,
-            s3_key=s3_key,
-            s3_url=s3_url
+            s3_key=s3_key
         )
 
         db.add(document)
         await db.commit()
         await db.refresh(document)
+        document_count_cache.invalidate(user.id)
 
         return document
 
@@ -89,21 +91,24 @@ class DocumentService:
         skip: int = 0,
         limit: int = 100
     ) -> Tuple[List[Document], int]:
-        """Get all documents for a user with pagination"""
+        """Get all documents for a user with pagination (cursor paging lives in list_documents_logic)"""
         result = await db.execute(
             select(Document)
             .filter(Document.user_id == user.id)
-            .order_by(Document.created_at.desc())
+            .order_by(Document.created_at.desc(), Document.id.desc())
             .offset(skip)
             .limit(limit)
         )
         documents = result.scalars().all()
 
-        # Get total count
-        count_result = await db.execute(
-            select(Document).filter(Document.user_id == user.id)
-        )
-        total = len(count_result.scalars().all())
+        # Get total count without loading rows
+        total = document_count_cache.get(user.id)
+        if total is None:
+            count_result = await db.execute(
+                select(func.count(Document.id)).filter(Document.user_id == user.id)
+            )
+            total = count_result.scalar() or 0
+            document_count_cache.set(user.id, None, total)
 
         return list(documents), total
 
@@ -133,6 +138,7 @@ class DocumentService:
         # Delete from database
         await db.delete(document)
         await db.commit()
+        document_count_cache.invalidate(document.user_id)
 
 
 document_service = DocumentService()
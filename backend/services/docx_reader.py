@@ -0,0 +1,104 @@
+import io
+import re
+import zipfile
+from typing import IO, Iterator, List
+from xml.etree.ElementTree import iterparse
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+P, T, TAB, BR, CR = W + "p", W + "t", W + "tab", W + "br", W + "cr"
+TBL, TR, TC = W + "tbl", W + "tr", W + "tc"
+
+CELL_SEPARATOR = " | "
+HEADER_FOOTER_RE = re.compile(r"^word/(header|footer)(\d*)\.xml$")
+
+
+def iter_part_lines(stream: IO[bytes]) -> Iterator[str]:
+    """
+    Stream the lines of one WordprocessingML part (document, header, footer).
+
+    Paragraphs are yielded as they close; table rows are yielded as one line
+    with cells joined by CELL_SEPARATOR (nested tables fold into their parent
+    cell). Finished top-level elements are cleared, so memory stays bounded
+    by the largest single paragraph or table rather than the whole document.
+    """
+    paragraphs: List[List[str]] = []
+    tables: List[dict] = []
+    open_elements = []
+    for event, elem in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            open_elements.append(elem)
+            if elem.tag == P:
+                paragraphs.append([])
+            elif elem.tag == TBL:
+                tables.append({"row": [], "cell": []})
+            continue
+
+        open_elements.pop()
+        tag = elem.tag
+        if tag == T:
+            if paragraphs:
+                paragraphs[-1].append(elem.text or "")
+        elif tag == TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (BR, CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == P:
+            text = "".join(paragraphs.pop())
+            if paragraphs:
+                # Text box paragraph inside a run: fold into the outer paragraph
+                paragraphs[-1].append(text)
+            elif tables:
+                tables[-1]["cell"].append(text)
+            else:
+                yield text
+        elif tag == TC and tables:
+            table = tables[-1]
+            table["row"].append(" ".join(t for t in table["cell"] if t))
+            table["cell"] = []
+        elif tag == TR and tables:
+            line = CELL_SEPARATOR.join(tables[-1]["row"])
+            tables[-1]["row"] = []
+            if len(tables) > 1:
+                tables[-2]["cell"].append(line)
+            else:
+                yield line
+        elif tag == TBL and tables:
+            tables.pop()
+
+        if tag in (P, TBL) and not paragraphs and not tables and open_elements:
+            # Top-level block finished: drop it from the tree
+            open_elements[-1].clear()
+
+
+def _part_names(zf: zipfile.ZipFile, kind: str) -> List[str]:
+    names = []
+    for name in zf.namelist():
+        m = HEADER_FOOTER_RE.match(name)
+        if m and m.group(1) == kind:
+            names.append((int(m.group(2) or 0), name))
+    return [name for _, name in sorted(names)]
+
+
+def _unique_lines(zf: zipfile.ZipFile, names: List[str]) -> List[str]:
+    """Headers/footers repeat (default/first/even); keep each line once."""
+    seen = set()
+    lines = []
+    for name in names:
+        with zf.open(name) as part:
+            for line in iter_part_lines(part):
+                if line.strip() and line not in seen:
+                    seen.add(line)
+                    lines.append(line)
+    return lines
+
+
+def extract_docx_text(content: bytes) -> str:
+    """Headers, body (paragraphs and tables in order) and footers of a DOCX held in memory."""
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        headers = _unique_lines(zf, _part_names(zf, "header"))
+        with zf.open("word/document.xml") as part:
+            body = list(iter_part_lines(part))
+        footers = _unique_lines(zf, _part_names(zf, "footer"))
+    return "\n".join(headers + body + footers)
@@ -0,0 +1,91 @@
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from core.config import settings
+from core.tracing import tracer
+
+# Long side of an A4 page in inches; used to estimate the DPI of photos
+A4_LONG_SIDE_INCHES = 11.69
+DESKEW_SAMPLE_SIDE = 800
+
+
+def estimate_dpi(img: Image.Image) -> float:
+    """Assume a photographed page roughly fills the frame."""
+    return max(img.size) / A4_LONG_SIDE_INCHES
+
+
+def downscale_to_dpi(img: Image.Image, dpi: float, target_dpi: int) -> Image.Image:
+    if dpi <= target_dpi * 1.1:
+        return img
+    scale = target_dpi / dpi
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    # reducing_gap does a fast integer pre-reduction before the Lanczos pass
+    return img.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+
+def _box_mean(a: np.ndarray, radius: int) -> np.ndarray:
+    """Sliding-window mean with edge replication, via separable cumulative sums."""
+    k = 2 * radius + 1
+    padded = np.pad(a, radius, mode="edge")
+    # int32 is exact here: a page column sums to < 2**31 at any sane DPI
+    c = np.zeros((padded.shape[0] + 1, padded.shape[1]), dtype=np.int32)
+    np.cumsum(padded, axis=0, dtype=np.int32, out=c[1:])
+    vertical = c[k:] - c[:-k]
+    c = np.zeros((vertical.shape[0], vertical.shape[1] + 1), dtype=np.int32)
+    np.cumsum(vertical, axis=1, dtype=np.int32, out=c[:, 1:])
+    return (c[:, k:] - c[:, :-k]).astype(np.float32) * (1.0 / (k * k))
+
+
+def adaptive_threshold(gray: np.ndarray, window: int, offset: int) -> np.ndarray:
+    """
+    Mean-C adaptive binarization: a pixel is ink when it is darker than its
+    neighbourhood mean by more than `offset`. Handles uneven phone lighting
+    where a single global threshold fails.
+    """
+    mean = _box_mean(gray, max(1, window // 2))
+    mean -= offset
+    return np.where(gray < mean, 0, 255).astype(np.uint8)
+
+
+def estimate_skew(gray: Image.Image, max_angle: float, step: float = 0.5) -> float:
+    """Projection-profile skew estimate on a small binarized copy, in degrees."""
+    small = gray.copy()
+    small.thumbnail((DESKEW_SAMPLE_SIDE, DESKEW_SAMPLE_SIDE))
+    ink = Image.fromarray(adaptive_threshold(np.asarray(small), 15, 10))
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rotated = np.asarray(ink.rotate(float(angle), resample=Image.NEAREST, fillcolor=255))
+        profile = (rotated < 128).sum(axis=1, dtype=np.int64)
+        # Text lines aligned with rows give a spiky profile
+        score = float(np.square(np.diff(profile)).sum())
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+@tracer.start_as_current_span("ocr.preprocess")
+def preprocess_for_ocr(img: Image.Image, dpi: Optional[float] = None) -> Image.Image:
+    """
+    Prepare a page image for Tesseract: EXIF orientation, downscale to the
+    target DPI, grayscale, deskew and adaptive thresholding. `dpi` is the
+    known resolution for rendered PDF pages; photos are estimated.
+    """
+    if not settings.ocr_preprocess:
+        return img
+    img = ImageOps.exif_transpose(img)
+    gray = img.convert("L")
+    gray = downscale_to_dpi(gray, dpi or estimate_dpi(gray), settings.ocr_target_dpi)
+    if settings.ocr_deskew:
+        angle = estimate_skew(gray, settings.ocr_deskew_max_angle)
+        if abs(angle) >= 0.25:
+            gray = gray.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)
+    if settings.ocr_binarize:
+        binary = adaptive_threshold(
+            np.asarray(gray),
+            settings.ocr_threshold_window,
+            settings.ocr_threshold_offset,
+        )
+        return Image.fromarray(binary)
+    return gray
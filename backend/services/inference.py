@@ -0,0 +1,102 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+
+from core.config import settings
+from core.metrics import MODEL_INFERENCE_SECONDS
+from services.model_artifact import CompactModel, probability_thresholds
+
+# Prediction path for the local model. Kept free of scikit-learn imports:
+# when the compact artifact matches the saved bundle, predictions never touch
+# sklearn, and the joblib bundle is only unpickled as a fallback.
+
+_model_lock = threading.Lock()
+_model: Optional[Tuple[Tuple[str, int], Union[CompactModel, "BundleModel"]]] = None
+
+
+def model_ready() -> bool:
+    return os.path.exists(settings.model_file)
+
+
+def artifact_dir() -> str:
+    """Where the compact copy of settings.model_file lives"""
+    return settings.model_artifact_dir or os.path.splitext(settings.model_file)[0] + ".compact"
+
+
+class BundleModel:
+    """The CompactModel interface over a joblib bundle (metadata-feature models, compact export off)"""
+
+    def __init__(self, bundle: Dict):
+        self.vectorizer = bundle["vectorizer"]
+        self.classifier = bundle["classifier"]
+        self.mlb = bundle["mlb"]
+        self.classes: List[str] = [str(c) for c in self.mlb.classes_]
+        self.thresholds = probability_thresholds(self.classifier)
+
+    def predict(self, text: str) -> List[str]:
+        labels = self.mlb.inverse_transform(self.classifier.predict(self.vectorizer.transform([text])))
+        return sorted(labels[0]) if labels else []
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        proba = self.classifier.predict_proba(self.vectorizer.transform(texts))
+        if isinstance(proba, list):
+            # MultiOutputClassifier: one (n, 2) array per category
+            proba = np.column_stack([p[:, 1] for p in proba])
+        return np.asarray(proba, dtype=np.float64)
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        return self.predict_proba_batch([text])[0]
+
+    def labels_from_proba(self, proba: np.ndarray) -> List[str]:
+        return sorted(c for c, p, t in zip(self.classes, proba, self.thresholds) if p > t)
+
+
+def _load_model(stamp: int) -> Union[CompactModel, BundleModel]:
+    if settings.model_compact:
+        try:
+            model = CompactModel.load(artifact_dir())
+            if model.source_stamp == stamp:
+                return model
+        except (OSError, ValueError, KeyError):
+            pass
+    return BundleModel(joblib.load(settings.model_file))
+
+
+def get_model() -> Optional[Union[CompactModel, BundleModel]]:
+    """
+    The current local model, reloaded only when the bundle file changes
+    (retrain, online update), so steady-state calls cost one stat().
+    """
+    global _model
+    try:
+        stamp = os.stat(settings.model_file).st_mtime_ns
+    except OSError:
+        return None
+    key = (settings.model_file, stamp)
+    cached = _model
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _model_lock:
+        if _model is None or _model[0] != key:
+            _model = (key, _load_model(stamp))
+        return _model[1]
+
+
+@MODEL_INFERENCE_SECONDS.time()
+def predict_categories(text: str) -> List[str]:
+    model = get_model()
+    if model is None:
+        return []
+    return model.predict(text)
+
+
+@MODEL_INFERENCE_SECONDS.time()
+def predict_probabilities(text: str) -> Dict[str, float]:
+    """Per-category probabilities from the local model; empty when none is trained."""
+    model = get_model()
+    if model is None:
+        return {}
+    return {c: float(p) for c, p in zip(model.classes, model.predict_proba(text))}
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Character classes for script profiling
+OTHER, SPACE, DIGIT, LATIN, KHMER = range(5)
+_CLASS_COUNT = 5
+
+# Codepoint -> class lookup covering everything up to the end of the Khmer
+# block; higher codepoints clip onto the last entry, which is OTHER.
+_TABLE = np.full(0x1801, OTHER, dtype=np.uint8)
+_TABLE[[ord(c) for c in " \t\n\r\f\v\u00a0"]] = SPACE
+_TABLE[ord("0"):ord("9") + 1] = DIGIT
+_TABLE[ord("A"):ord("Z") + 1] = LATIN
+_TABLE[ord("a"):ord("z") + 1] = LATIN
+_TABLE[0x1780:0x1800] = KHMER
+
+# Longer texts are profiled in slices so the UTF-32 buffer stays bounded
+CHUNK_CHARS = 1 << 20
+
+PRIMARY_THRESHOLD = 0.7  # Share of letters a script needs to be the primary language
+MIXED_THRESHOLD = 0.15  # Both scripts above this share mark the text as mixed
+
+
+@dataclass(frozen=True)
+class LanguageProfile:
+    khmer_chars: int = 0
+    latin_chars: int = 0
+    digit_chars: int = 0
+    other_chars: int = 0
+
+    @property
+    def letters(self) -> int:
+        return self.khmer_chars + self.latin_chars
+
+    @property
+    def khmer_ratio(self) -> float:
+        return self.khmer_chars / self.letters if self.letters else 0.0
+
+    @property
+    def english_ratio(self) -> float:
+        return self.latin_chars / self.letters if self.letters else 0.0
+
+    @property
+    def primary_language(self) -> str:
+        if not self.letters:
+            return "unknown"
+        if self.khmer_ratio > PRIMARY_THRESHOLD:
+            return "khmer"
+        if self.english_ratio > PRIMARY_THRESHOLD:
+            return "english"
+        return "mixed"
+
+    @property
+    def is_mixed(self) -> bool:
+        return self.khmer_ratio > MIXED_THRESHOLD and self.english_ratio > MIXED_THRESHOLD
+
+    def __add__(self, other: "LanguageProfile") -> "LanguageProfile":
+        return LanguageProfile(
+            khmer_chars=self.khmer_chars + other.khmer_chars,
+            latin_chars=self.latin_chars + other.latin_chars,
+            digit_chars=self.digit_chars + other.digit_chars,
+            other_chars=self.other_chars + other.other_chars,
+        )
+
+    def as_dict(self) -> Dict:
+        """The shape DataCollector stores in metadata.jsonl"""
+        return {
+            "primary_language": self.primary_language,
+            "is_mixed": self.is_mixed,
+            "khmer_ratio": round(self.khmer_ratio, 3),
+            "english_ratio": round(self.english_ratio, 3),
+        }
+
+
+def _classify(text: str) -> np.ndarray:
+    codepoints = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    return _TABLE[np.minimum(codepoints, len(_TABLE) - 1)]
+
+
+def _from_counts(counts) -> LanguageProfile:
+    return LanguageProfile(
+        khmer_chars=int(counts[KHMER]),
+        latin_chars=int(counts[LATIN]),
+        digit_chars=int(counts[DIGIT]),
+        other_chars=int(counts[OTHER]),
+    )
+
+
+def profile_text(text: str) -> LanguageProfile:
+    """
+    Count Khmer, Latin, digit and other characters in one vectorised pass.
+    Khmer is the whole U+1780-U+17FF block (Khmer digits included) and
+    Latin is ASCII letters, matching the regexes this replaces.
+    """
+    counts = np.zeros(_CLASS_COUNT, dtype=np.int64)
+    for start in range(0, len(text), CHUNK_CHARS):
+        counts += np.bincount(_classify(text[start:start + CHUNK_CHARS]), minlength=_CLASS_COUNT)
+    return _from_counts(counts)
+
+
+def profile_segments(text: str, separator: str = "\n\n") -> List[LanguageProfile]:
+    """
+    Profile each `separator`-delimited segment (paragraphs by default) with a
+    single classification pass over the text, in the same CHUNK_CHARS slices
+    as profile_text. Segments without any non-space character are left out.
+    """
+    if not text:
+        return []
+    starts = [0]
+    pos = text.find(separator)
+    while pos != -1:
+        starts.append(pos + len(separator))
+        pos = text.find(separator, pos + len(separator))
+    starts = np.array(starts, dtype=np.int64)
+    # Separator characters are counted with the segment they close
+    ends = np.append(starts[1:], len(text))
+    counts = np.zeros((len(starts), _CLASS_COUNT), dtype=np.int64)
+    for start in range(0, len(text), CHUNK_CHARS):
+        stop = min(start + CHUNK_CHARS, len(text))
+        # Segments overlapping [start, stop), clipped to the slice
+        first = int(np.searchsorted(starts, start, side="right")) - 1
+        last = int(np.searchsorted(starts, stop - 1, side="right"))
+        lengths = np.minimum(ends[first:last], stop) - np.maximum(starts[first:last], start)
+        segment_ids = np.repeat(np.arange(last - first), lengths)
+        counts[first:last] += np.bincount(
+            segment_ids * _CLASS_COUNT + _classify(text[start:stop]),
+            minlength=(last - first) * _CLASS_COUNT,
+        ).reshape(last - first, _CLASS_COUNT)
+    return [
+        _from_counts(row) for row in counts
+        if row.sum() > row[SPACE]
+    ]
+
+
+def merge_profiles(profiles: Iterable[LanguageProfile]) -> LanguageProfile:
+    total = LanguageProfile()
+    for profile in profiles:
+        total = total + profile
+    return total
+
+
+def segment_summary(profiles: Iterable[LanguageProfile]) -> Dict[str, int]:
+    """Number of segments per primary language, e.g. {"khmer": 3, "english": 5}"""
+    summary: Dict[str, int] = {}
+    for profile in profiles:
+        summary[profile.primary_language] = summary.get(profile.primary_language, 0) + 1
+    return summary
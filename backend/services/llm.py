@@ -1,9 +1,13 @@
 import json
-from typing import List, Dict
+import time
+from typing import Awaitable, Callable, List, Dict
 import httpx
 
 # Support both package and module execution
 from core.config import settings
+from core.metrics import LLM_REQUEST_SECONDS
+from core.tracing import tracer
+from opentelemetry.trace import Status, StatusCode
 
 SYSTEM_PROMPT = (
     "You are an AI assistant that extracts project risks. "
@@ -28,9 +32,9 @@ class LLMClient:
         """
         try:
             if self.provider == "gemini":
-                return await self._gemini_generate(text)
+                return await self._timed("gemini", settings.gemini_model, self._gemini_generate, text)
             elif self.provider == "ollama":
-                return await self._ollama_generate(text)
+                return await self._timed("ollama", settings.ollama_model, self._ollama_generate, text)
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
@@ -39,7 +43,7 @@ class LLMClient:
         # Fallback to Groq if primary fails or is not gemini/ollama
         if settings.groq_api_key:
             try:
-                return await self._groq_generate(text)
+                return await self._timed("groq", settings.groq_model, self._groq_generate, text)
             except Exception as e:
                 import logging
                 logger = logging.getLogger(__name__)
@@ -47,6 +51,37 @@ class LLMClient:
         
         raise RuntimeError("All LLM providers failed or were not configured.")
 
+    async def _timed(
+        self,
+        provider: str,
+        model: str,
+        generate: Callable[[str], Awaitable[List[Dict]]],
+        text: str
+    ) -> List[Dict]:
+        """Run one provider call in its own span, recording its latency and outcome."""
+        started = time.perf_counter()
+        outcome = "error"
+        with tracer.start_as_current_span(
+            f"llm.{provider}",
+            attributes={"llm.provider": provider, "llm.model": model, "llm.input_chars": len(text)},
+            record_exception=False,
+            set_status_on_exception=False,
+        ) as span:
+            try:
+                risks = await generate(text)
+                outcome = "ok"
+                span.set_attribute("llm.risk_count", len(risks))
+                return risks
+            except Exception as e:
+                # The fallback chain handles it; keep the failure visible on this span
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+            finally:
+                LLM_REQUEST_SECONDS.labels(provider=provider, model=model, outcome=outcome).observe(
+                    time.perf_counter() - started
+                )
+
     async def _groq_generate(self, text: str) -> List[Dict]:
         """Generate analysis using Groq (fallback provider)."""
         from groq import Groq
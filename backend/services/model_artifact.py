@@ -0,0 +1,320 @@
+import json
+import math
+import os
+import re
+import shutil
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Compact model format: a directory of .npy arrays plus a JSON header, loaded
+# with np.load(mmap_mode="r") so worker processes share the pages. Neither
+# export nor inference imports scikit-learn; the fitted estimators are read
+# through their public attributes.
+#
+#   meta.json        format version, kind, classes, probability thresholds, analyzer settings
+#   coef.npy         (n_features, n_classes) float32, one row per feature
+#   intercept.npy    (n_classes,) float32
+#   idf.npy          (n_features,) float64, absent when use_idf is off
+#   vocabulary.txt   TF-IDF only: one term per line, line number = column
+
+FORMAT_VERSION = 1
+
+
+def sigmoid(x):
+    # Decision values of +/-inf (constant categories) map to exactly 1/0
+    with np.errstate(over="ignore"):
+        return 1.0 / (1.0 + np.exp(-np.asarray(x, dtype=np.float64)))
+
+
+def _check_analyzer(vectorizer) -> None:
+    if (
+        vectorizer.analyzer != "word"
+        or vectorizer.tokenizer is not None
+        or vectorizer.preprocessor is not None
+        or vectorizer.stop_words is not None
+        or vectorizer.strip_accents is not None
+    ):
+        raise ValueError("Only the default word analyzer can be exported")
+
+
+def _analyzer_meta(vectorizer) -> Dict:
+    return {
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "binary": bool(vectorizer.binary),
+    }
+
+
+def _tfidf_meta(transformer) -> Dict:
+    return {
+        "sublinear_tf": bool(transformer.sublinear_tf),
+        "norm": transformer.norm,
+        "use_idf": bool(transformer.use_idf),
+    }
+
+
+def _linear_parts(classifier) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Stack the per-category binary estimators of a OneVsRestClassifier or
+    MultiOutputClassifier into one coefficient matrix and intercept vector.
+    Categories that were constant in training become +/-inf intercepts.
+    """
+    estimators = classifier.estimators_
+    n_features = next(e.coef_.shape[1] for e in estimators if hasattr(e, "coef_"))
+    coef = np.zeros((n_features, len(estimators)), dtype=np.float32)
+    intercept = np.zeros(len(estimators), dtype=np.float32)
+    for i, estimator in enumerate(estimators):
+        if hasattr(estimator, "coef_"):
+            coef[:, i] = estimator.coef_.ravel()
+            intercept[i] = estimator.intercept_[0]
+        else:
+            intercept[i] = np.inf if estimator.y_[0] else -np.inf
+    return coef, intercept, _decision_threshold(classifier)
+
+
+def _decision_threshold(classifier) -> float:
+    # OneVsRestClassifier thresholds decision values at 0.5 instead of 0
+    # when its first estimator is a constant predictor
+    return 0.5 if type(classifier.estimators_[0]).__name__ == "_ConstantPredictor" else 0.0
+
+
+def probability_thresholds(classifier) -> np.ndarray:
+    """
+    Per-category probability cut-offs that reproduce classifier.predict.
+    Both classifier types are logistic, so sigmoid(decision) is the
+    probability predict_proba reports and a decision threshold t becomes
+    probability sigmoid(t). Shared by the compact export and BundleModel.
+    """
+    return np.full(len(classifier.estimators_), float(sigmoid(_decision_threshold(classifier))))
+
+
+def export_artifact(bundle: Dict, directory: str, source_stamp: Optional[int] = None) -> None:
+    """
+    Write `bundle` (as saved by services.trainer) in the compact format.
+    `source_stamp` is the st_mtime_ns of the bundle file, used by
+    services.inference to tell whether the artifact is current.
+    Raises ValueError for bundles the format cannot represent.
+    """
+    if bundle.get("use_metadata"):
+        raise ValueError("Models trained with metadata features cannot be exported")
+    vectorizer = bundle["vectorizer"]
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "classes": [str(c) for c in bundle["mlb"].classes_],
+        "source_stamp": source_stamp,
+        "model_id": bundle.get("model_id"),
+        "version": bundle.get("version"),
+    }
+    arrays = {}
+    vocabulary = None
+    if bundle.get("mode") == "hashing":
+        hashing, transformer = (step for _, step in vectorizer.steps)
+        _check_analyzer(hashing)
+        meta.update(
+            kind="hashing",
+            n_features=int(hashing.n_features),
+            alternate_sign=bool(hashing.alternate_sign),
+            hashing_norm=hashing.norm,
+            **_analyzer_meta(hashing),
+            **_tfidf_meta(transformer),
+        )
+        if transformer.use_idf:
+            arrays["idf"] = transformer.idf_
+    else:
+        _check_analyzer(vectorizer)
+        vocabulary = [None] * len(vectorizer.vocabulary_)
+        for term, column in vectorizer.vocabulary_.items():
+            vocabulary[column] = term
+        meta.update(
+            kind="tfidf",
+            n_features=len(vocabulary),
+            **_analyzer_meta(vectorizer),
+            **_tfidf_meta(vectorizer),
+        )
+        if vectorizer.use_idf:
+            arrays["idf"] = vectorizer.idf_
+    arrays["coef"], arrays["intercept"], meta["decision_threshold"] = _linear_parts(bundle["classifier"])
+    meta["thresholds"] = probability_thresholds(bundle["classifier"]).tolist()
+
+    # Build next to the target, then swap it in
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = os.path.join(parent, f".{os.path.basename(directory)}-{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+        if vocabulary is not None:
+            with open(os.path.join(tmp_dir, "vocabulary.txt"), "w", encoding="utf-8") as f:
+                f.write("\n".join(vocabulary))
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        old_dir = None
+        if os.path.exists(directory):
+            old_dir = tmp_dir + ".old"
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def remove_artifact(directory: str) -> None:
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class CompactModel:
+    """
+    Inference over an exported artifact: the same tokenization, n-grams,
+    TF-IDF weighting and normalisation as the fitted scikit-learn pipeline,
+    then one sparse-dense product with the stacked (n_features, n_classes)
+    coefficients and a sigmoid. A single document is scored by gathering
+    the coefficient rows of its non-zero features; batches go through a
+    SciPy CSR matrix.
+    """
+
+    def __init__(self, meta: Dict, coef: np.ndarray, intercept: np.ndarray,
+                 idf: Optional[np.ndarray] = None, vocabulary: Optional[Dict[str, int]] = None):
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model artifact version {meta.get('format_version')}")
+        self.meta = meta
+        self.classes: List[str] = meta["classes"]
+        self.source_stamp: Optional[int] = meta.get("source_stamp")
+        self.coef = coef
+        self.intercept = intercept.astype(np.float64)
+        self.idf = idf
+        self.vocabulary = vocabulary
+        self.decision_threshold = meta["decision_threshold"]
+        self.thresholds = np.asarray(
+            meta.get("thresholds") or [sigmoid(self.decision_threshold)] * len(self.classes),
+            dtype=np.float64,
+        )
+        self._token_re = re.compile(meta["token_pattern"])
+        self._min_n, self._max_n = meta["ngram_range"]
+        self._hash = None
+        if meta["kind"] == "hashing":
+            # Only the hashing variant needs scikit-learn, for its MurmurHash3
+            from sklearn.utils.murmurhash import murmurhash3_32
+            self._hash = murmurhash3_32
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CompactModel":
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        idf_path = os.path.join(directory, "idf.npy")
+        vocabulary = None
+        if meta["kind"] == "tfidf":
+            with open(os.path.join(directory, "vocabulary.txt"), "r", encoding="utf-8") as f:
+                vocabulary = {term: column for column, term in enumerate(f.read().split("\n"))}
+        return cls(
+            meta,
+            coef=np.load(os.path.join(directory, "coef.npy"), mmap_mode=mode),
+            intercept=np.load(os.path.join(directory, "intercept.npy")),
+            idf=np.load(idf_path, mmap_mode=mode) if os.path.exists(idf_path) else None,
+            vocabulary=vocabulary,
+        )
+
+    def _analyze(self, text: str) -> List[str]:
+        if self.meta["lowercase"]:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        if self._max_n == 1:
+            return tokens
+        # Mirrors scikit-learn's _word_ngrams
+        original = tokens
+        min_n = self._min_n
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        for n in range(min_n, min(self._max_n + 1, len(original) + 1)):
+            for i in range(len(original) - n + 1):
+                tokens.append(" ".join(original[i:i + n]))
+        return tokens
+
+    def _counts(self, tokens: List[str]) -> Dict[int, float]:
+        if self._hash is None:
+            vocabulary = self.vocabulary
+            return Counter(vocabulary[t] for t in tokens if t in vocabulary)
+        n_features = self.meta["n_features"]
+        alternate_sign = self.meta["alternate_sign"]
+        counts: Dict[int, float] = {}
+        for token in tokens:
+            h = self._hash(token, seed=0)
+            if h == -2147483648:
+                column = (2147483647 - (n_features - 1)) % n_features
+            else:
+                column = abs(h) % n_features
+            value = (1.0 if h >= 0 else -1.0) if alternate_sign else 1.0
+            counts[column] = counts.get(column, 0.0) + value
+        return counts
+
+    @staticmethod
+    def _normalize(values: np.ndarray, norm: Optional[str]) -> np.ndarray:
+        if norm == "l2":
+            scale = math.sqrt(float(values @ values))
+        elif norm == "l1":
+            scale = float(np.abs(values).sum())
+        else:
+            return values
+        return values / scale if scale else values
+
+    def vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse TF-IDF vector of `text`: (column indices, weights)."""
+        counts = self._counts(self._analyze(text))
+        columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        keep = values != 0
+        columns, values = columns[keep], values[keep]
+        if self.meta["binary"]:
+            values = np.ones_like(values)
+        if self._hash is not None:
+            values = self._normalize(values, self.meta["hashing_norm"])
+        if self.meta["sublinear_tf"]:
+            values = np.log(values) + 1
+        if self.idf is not None:
+            values = values * self.idf[columns]
+        return columns, self._normalize(values, self.meta["norm"])
+
+    def score_vector(self, columns: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Decision values for one vectorized document"""
+        return values @ self.coef[columns] + self.intercept
+
+    def decision_function(self, text: str) -> np.ndarray:
+        return self.score_vector(*self.vectorize(text))
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """Per-category probabilities, in `classes` order"""
+        return sigmoid(self.decision_function(text))
+
+    def predict(self, text: str) -> List[str]:
+        return self.labels_from_proba(self.predict_proba(text))
+
+    def labels_from_proba(self, proba: np.ndarray) -> List[str]:
+        return sorted(c for c, p, t in zip(self.classes, proba, self.thresholds) if p > t)
+
+    def vectorize_batch(self, texts: List[str]):
+        """CSR matrix of TF-IDF vectors, one row per text"""
+        from scipy.sparse import csr_matrix
+
+        rows = [self.vectorize(text) for text in texts]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(columns) for columns, _ in rows], out=indptr[1:])
+        indices = np.concatenate([columns for columns, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([values for _, values in rows]) if rows else np.zeros(0)
+        return csr_matrix((data, indices, indptr), shape=(len(rows), self.coef.shape[0]))
+
+    def decision_batch(self, texts: List[str]) -> np.ndarray:
+        """(n_texts, n_classes) decision values from one sparse-dense matmul"""
+        return np.asarray(self.vectorize_batch(texts) @ self.coef) + self.intercept
+
+    def predict_proba_batch(self, texts: List[str]) -> np.ndarray:
+        return sigmoid(self.decision_batch(texts))
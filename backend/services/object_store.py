@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import mmap
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, BinaryIO, Optional, Union
+
+from botocore.exceptions import ClientError
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+class ObjectNotFoundError(Exception):
+    """Raised when a key does not exist in the object store"""
+
+
+class ObjectStore(ABC):
+    """Async storage backend for document bytes, addressed by key"""
+
+    @abstractmethod
+    async def put(self, key: str, data: Union[bytes, BinaryIO], content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def iter_chunks(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for the key when the backend is disk-based"""
+        return None
+
+    def url(self, key: str) -> Optional[str]:
+        """Time-limited direct download URL when the backend can issue one"""
+        return None
+
+
+class S3ObjectStore(ObjectStore):
+    """S3/R2 backend on top of the shared StorageService client"""
+
+    def __init__(self, storage=None):
+        if storage is None:
+            from services.storage import storage_service as storage
+        self.storage = storage
+
+    async def put(self, key: str, data: Union[bytes, BinaryIO], content_type: str) -> None:
+        # Same SSE-S3 default as StorageService.upload_file
+        await self.storage.upload_fileobj(
+            data, key, {"ContentType": content_type, "ServerSideEncryption": "AES256"}
+        )
+
+    def url(self, key: str) -> Optional[str]:
+        return self.storage.get_cached_url(key)
+
+    async def _get_body(self, key: str):
+        try:
+            response = await asyncio.to_thread(
+                self.storage.s3_client.get_object,
+                Bucket=self.storage.bucket_name,
+                Key=key,
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise ObjectNotFoundError(key) from e
+            raise
+        return response["Body"]
+
+    async def get(self, key: str) -> bytes:
+        body = await self._get_body(key)
+        try:
+            return await asyncio.to_thread(body.read)
+        finally:
+            body.close()
+
+    async def iter_chunks(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        body = await self._get_body(key)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await self.storage.delete_file(key)
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(
+                self.storage.s3_client.head_object,
+                Bucket=self.storage.bucket_name,
+                Key=key,
+            )
+            return True
+        except ClientError:
+            return False
+
+
+class LocalObjectStore(ObjectStore):
+    """
+    Local-disk backend for development, tests and single-node deployments.
+    Reads stream from an mmap of the file so large objects are served from
+    the page cache in bounded chunks without loading them whole.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def local_path(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        return path if os.path.isfile(path) else None
+
+    def _write(self, path: str, data: Union[bytes, BinaryIO]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    f.write(data)
+                else:
+                    while True:
+                        chunk = data.read(DEFAULT_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+            # Atomic publish: readers never see a half-written object
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def put(self, key: str, data: Union[bytes, BinaryIO], content_type: str) -> None:
+        await asyncio.to_thread(self._write, self._path(key), data)
+
+    def _read(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError(key) from e
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, key)
+
+    async def iter_chunks(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError(key) from e
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Each slice is an independent bytes object, so nothing holds
+                # a buffer export on the map when it is closed
+                for offset in range(0, size, chunk_size):
+                    yield mm[offset:offset + chunk_size]
+
+    async def delete(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self._path(key))
+        except FileNotFoundError:
+            pass
+
+    async def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+
+def create_object_store() -> ObjectStore:
+    if settings.storage_backend == "local":
+        return LocalObjectStore(settings.local_storage_dir)
+    return S3ObjectStore()
+
+
+object_store = create_object_store()
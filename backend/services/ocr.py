@@ -1,6 +1,10 @@
-from typing import Optional
-import os
-from fastapi import UploadFile
+from typing import AsyncIterator, Dict, Iterator, Optional
+import asyncio
+import hashlib
+import io
+import json
+import time
+from xml.etree.ElementTree import ParseError
 from PIL import Image
 import pytesseract
 import fitz  # PyMuPDF
@@ -8,68 +12,181 @@ import docx
 
 # Support both package and module execution
 from core.config import settings
+from core.metrics import OCR_PAGE_SECONDS, QUEUE_DEPTH
+from core.tracing import tracer
+from opentelemetry import trace
+from services.ocr_planner import OcrPlanner
+from services.image_preprocess import preprocess_for_ocr
+from services.docx_reader import extract_docx_text
+
+# Bump whenever extraction output changes so cached texts are re-extracted
+EXTRACTOR_VERSION = 4
+
+# Settings that change extraction output; cached texts from other values are re-extracted
+EXTRACTOR_SETTINGS = (
+    "tesseract_lang",
+    "ocr_quality_threshold",
+    "ocr_min_text_chars",
+    "ocr_detect_script",
+    "ocr_script_min_confidence",
+    "ocr_min_wordlike_ratio",
+    "ocr_preprocess",
+    "ocr_target_dpi",
+    "ocr_deskew",
+    "ocr_deskew_max_angle",
+    "ocr_binarize",
+    "ocr_threshold_window",
+    "ocr_threshold_offset",
+)
+
+def extractor_fingerprint() -> str:
+    """Short hash of EXTRACTOR_VERSION and the current EXTRACTOR_SETTINGS values"""
+    values = [EXTRACTOR_VERSION] + [getattr(settings, name) for name in EXTRACTOR_SETTINGS]
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()[:16]
 
 def _ensure_tesseract_config():
     if settings.tesseract_cmd:
         pytesseract.pytesseract.tesseract_cmd = settings.tesseract_cmd
 
-async def extract_text(file: Optional[UploadFile] = None, text: Optional[str] = None) -> str:
-    if text:
-        return text
-    if not file:
-        return ""
-    filename = (file.filename or "").lower()
-    content = await file.read()
+def _annotate_extraction(span, stats: Dict) -> None:
+    span.set_attribute("extract.engine", stats.get("engine", "unknown"))
+    span.set_attribute("extract.page_count", stats.get("page_count", 0))
+    span.set_attribute("extract.pages_ocr", stats.get("pages_ocr", 0))
+
+def iter_document_pages(content: bytes, filename: Optional[str], stats: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Yield document text one page at a time as each page is ready.
+    PDFs yield per page; DOCX, images and plain text yield a single page.
+    `stats` is filled with extraction metadata once the generator is exhausted;
+    duration_ms counts extraction time only, not time spent by the consumer.
+    """
+    stats = stats if stats is not None else {}
+    stats.update({"engine": "utf8", "page_count": 1, "pages_ocr": 0, "language": None})
+    filename = (filename or "").lower()
     if filename.endswith(".pdf"):
-        return _extract_pdf_bytes(content)
-    if filename.endswith(".docx"):
-        return _extract_docx_bytes(content)
-    if any(filename.endswith(ext) for ext in [".png", ".jpg", ".jpeg", ".bmp", ".tiff"]):
-        return _extract_image_bytes(content)
+        pages = _iter_pdf_pages(content, stats)
+    elif filename.endswith(".docx"):
+        pages = iter([_extract_docx_bytes(content, stats)])
+    elif any(filename.endswith(ext) for ext in [".png", ".jpg", ".jpeg", ".bmp", ".tiff"]):
+        pages = iter([_extract_image_bytes(content, stats)])
+    else:
+        pages = iter([content.decode("utf-8", errors="ignore")])
+    elapsed = 0.0
+    started = time.perf_counter()
+    for page in pages:
+        elapsed += time.perf_counter() - started
+        yield page
+        started = time.perf_counter()
+    elapsed += time.perf_counter() - started
+    stats["duration_ms"] = int(elapsed * 1000)
+
+_PAGES_DONE = object()
+
+async def aiter_document_pages(
+    content: bytes,
+    filename: Optional[str],
+    stats: Optional[Dict] = None,
+    prefetch: int = 2
+) -> AsyncIterator[str]:
+    """
+    Async view of iter_document_pages. Extraction runs in a worker thread and
+    stays up to `prefetch` pages ahead of the consumer, so analysis of early
+    pages overlaps OCR of later ones.
+    """
+    pages = iter_document_pages(content, filename, stats)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+    depth = QUEUE_DEPTH.labels(queue="prefetched_pages")
+    queued = 0
+
+    async def produce():
+        nonlocal queued
+        try:
+            while True:
+                page = await asyncio.to_thread(next, pages, _PAGES_DONE)
+                await queue.put(page)
+                if page is _PAGES_DONE:
+                    return
+                queued += 1
+                depth.inc()
+        except Exception as e:
+            await queue.put(e)
+
+    # Worker-thread extraction runs in the producer's context, under this span
+    span = tracer.start_span("extract_document", attributes={"document.filename": filename or ""})
+    with trace.use_span(span, end_on_exit=False):
+        producer = asyncio.create_task(produce())
     try:
-        return content.decode("utf-8", errors="ignore")
-    except Exception:
-        return ""
+        while True:
+            page = await queue.get()
+            if page is _PAGES_DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            queued -= 1
+            depth.dec()
+            yield page
+    finally:
+        producer.cancel()
+        depth.dec(queued)
+        if stats is not None:
+            _annotate_extraction(span, stats)
+        span.end()
 
-def _extract_pdf_bytes(content: bytes) -> str:
-    text = []
+def _extract_pdf_bytes(content: bytes, stats: Optional[Dict] = None) -> str:
+    return "\n".join(_iter_pdf_pages(content, stats))
+
+def _iter_pdf_pages(content: bytes, stats: Optional[Dict] = None) -> Iterator[str]:
+    stats = stats if stats is not None else {}
+    stats["engine"] = "pymupdf"
+    _ensure_tesseract_config()
+    planner = OcrPlanner()
     with fitz.open(stream=content, filetype="pdf") as doc:
-        for page in doc:
-            page_text = page.get_text()
-            if not page_text.strip():
-                try:
-                    pix = page.get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    _ensure_tesseract_config()
-                    page_text = pytesseract.image_to_string(img, lang=settings.tesseract_lang)
-                except Exception as e:
-                    print(f"Warning: OCR failed for PDF page, skipping. Error: {e}")
-                    page_text = ""
-            text.append(page_text)
-    return "\n".join(text)
+        stats["page_count"] = doc.page_count
+        for number, page in enumerate(doc):
+            with tracer.start_as_current_span("pdf.page", attributes={"page.number": number}) as span:
+                page_text = page.get_text()
+                if planner.needs_ocr(page_text, has_images=bool(page.get_images())):
+                    span.set_attribute("page.ocr", True)
+                    try:
+                        with OCR_PAGE_SECONDS.labels(kind="pdf_page").time():
+                            with tracer.start_as_current_span("fitz.render"):
+                                pix = page.get_pixmap(dpi=settings.ocr_target_dpi, colorspace=fitz.csGRAY)
+                                img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+                            img = preprocess_for_ocr(img, dpi=settings.ocr_target_dpi)
+                            page_text = planner.ocr(img)
+                        stats["pages_ocr"] = stats.get("pages_ocr", 0) + 1
+                        stats["engine"] = "pymupdf+tesseract"
+                    except Exception as e:
+                        span.record_exception(e)
+                        print(f"Warning: OCR failed for PDF page, skipping. Error: {e}")
+                        page_text = ""
+                else:
+                    planner.observe(page_text)
+                if planner.decisions:
+                    stats["language"] = "+".join(sorted(set(planner.decisions)))
+            # Yield outside the span: the consumer's time is not this page's
+            yield page_text
 
-def _extract_docx_bytes(content: bytes) -> str:
-    import tempfile
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-        tmp.write(content)
-        tmp_path = tmp.name
+def _extract_docx_bytes(content: bytes, stats: Optional[Dict] = None) -> str:
+    stats = stats if stats is not None else {}
+    stats["engine"] = "docx-stream"
     try:
-        d = docx.Document(tmp_path)
+        with tracer.start_as_current_span("docx.parse"):
+            return extract_docx_text(content)
+    except (KeyError, ParseError) as e:
+        # Non-standard part layout or malformed XML; let python-docx have a go from memory
+        print(f"Warning: streaming DOCX parse failed, falling back to python-docx. Error: {e}")
+        stats["engine"] = "python-docx"
+        d = docx.Document(io.BytesIO(content))
         return "\n".join([p.text for p in d.paragraphs])
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
 
-def _extract_image_bytes(content: bytes) -> str:
+def _extract_image_bytes(content: bytes, stats: Optional[Dict] = None) -> str:
+    stats = stats if stats is not None else {}
     _ensure_tesseract_config()
-    import io
-    img = Image.open(io.BytesIO(content))
-    try:
-        return pytesseract.image_to_string(img, lang=settings.tesseract_lang)
-    except pytesseract.TesseractError as e:
-        if 'khm' in settings.tesseract_lang.lower() and 'eng' in settings.tesseract_lang.lower():
-            print(f"Warning: Khmer language data not found, falling back to English only. Error: {e}")
-            return pytesseract.image_to_string(img, lang='eng')
-        raise
+    with OCR_PAGE_SECONDS.labels(kind="image").time():
+        img = preprocess_for_ocr(Image.open(io.BytesIO(content)))
+        # The planner only uses installed traineddata, so no failing eng+khm run
+        planner = OcrPlanner()
+        text = planner.ocr(img)
+    stats.update(engine="tesseract", pages_ocr=1, language=planner.decisions[-1])
+    return text
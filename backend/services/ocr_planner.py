@@ -0,0 +1,162 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from PIL import Image
+import pytesseract
+
+from core.config import settings
+from core.tracing import tracer
+from services.language_profile import profile_text
+
+# UTF-8 text that was decoded as cp1252/latin-1 somewhere upstream ("â€™", "Ã©")
+MOJIBAKE_RE = re.compile("[\u00c2\u00c3\u00e2][\u0080-\u00bf\u20ac\u2122\u0153\u017e\u201a-\u201e]")
+
+# Tesseract OSD script name -> cheapest traineddata that covers it
+SCRIPT_LANGS = {
+    "Latin": "eng",
+}
+
+OSD_MAX_SIDE = 1000
+
+# Letters a Latin-only neighbouring page needs before it counts as a hint
+HINT_MIN_LETTERS = 40
+
+WORDLIKE_RE = re.compile(r"^[^\w]*(?:[A-Za-z]{2,}|\d+(?:[.,:/-]\d+)*)[^\w]*$")
+
+
+def text_layer_quality(text: str) -> float:
+    """
+    Score an embedded text layer in [0, 1].
+    Replacement characters, private-use glyphs (unmapped font encodings),
+    control characters and mojibake sequences all count against it.
+    """
+    total = 0
+    bad = 0
+    for ch in text:
+        if ch.isspace():
+            continue
+        total += 1
+        if ch == "\ufffd" or unicodedata.category(ch) in ("Cc", "Co", "Cs", "Cn"):
+            bad += 1
+    if total == 0:
+        return 0.0
+    bad += 2 * len(MOJIBAKE_RE.findall(text))
+    return max(0.0, 1.0 - bad / total)
+
+
+def wordlike_ratio(text: str) -> float:
+    """Share of tokens that look like words or numbers; Latin OCR of a non-Latin page scores low."""
+    tokens = text.split()
+    if not tokens:
+        return 0.0
+    return sum(1 for t in tokens if WORDLIKE_RE.match(t)) / len(tokens)
+
+
+@lru_cache(maxsize=1)
+def installed_languages() -> frozenset:
+    try:
+        return frozenset(pytesseract.get_languages(config=""))
+    except Exception:
+        return frozenset()
+
+
+def configured_languages() -> str:
+    """settings.tesseract_lang restricted to traineddata that is actually installed."""
+    wanted = [lang for lang in settings.tesseract_lang.split("+") if lang]
+    installed = installed_languages()
+    if not installed:
+        return settings.tesseract_lang
+    usable = [lang for lang in wanted if lang in installed]
+    return "+".join(usable) if usable else "eng"
+
+
+def detect_script(img: Image.Image) -> Optional[Dict]:
+    """Quick OSD pass on a downscaled copy; returns {'script', 'confidence'} or None."""
+    small = img
+    if max(img.size) > OSD_MAX_SIDE:
+        small = img.copy()
+        small.thumbnail((OSD_MAX_SIDE, OSD_MAX_SIDE))
+    try:
+        with tracer.start_as_current_span("tesseract.osd"):
+            osd = pytesseract.image_to_osd(small, output_type=pytesseract.Output.DICT)
+    except Exception:
+        return None
+    return {"script": osd.get("script"), "confidence": float(osd.get("script_conf", 0.0))}
+
+
+class OcrPlanner:
+    """
+    Per-document OCR plan.
+
+    Decides whether a PDF page's text layer is good enough to skip Tesseract,
+    and which language set to OCR with. Once a few pages agree on a script
+    the decision is reused for the rest of the document instead of running
+    detection on every page; a poor OCR result drops the cached decision.
+    Text seen on earlier pages (text layers and OCR output) is profiled, and
+    a Latin-only neighbour stands in for OSD when OSD has no confident answer.
+    """
+
+    def __init__(self, stable_after: int = 2):
+        self.full_langs = configured_languages()
+        self.stable_after = stable_after
+        self._cached_lang: Optional[str] = None
+        self._streak_lang: Optional[str] = None
+        self._streak = 0
+        self._hint: Optional[str] = None
+        self.decisions: List[str] = []
+
+    def needs_ocr(self, page_text: str, has_images: bool = True) -> bool:
+        stripped = page_text.strip()
+        if not stripped:
+            return True
+        if len(stripped) < settings.ocr_min_text_chars and has_images:
+            return True
+        return text_layer_quality(stripped) < settings.ocr_quality_threshold
+
+    def observe(self, text: str) -> None:
+        """Profile a page's text so the next OCR'd page can use it as a script hint."""
+        profile = profile_text(text)
+        if profile.khmer_chars:
+            self._hint = None
+        elif profile.latin_chars >= HINT_MIN_LETTERS:
+            self._hint = SCRIPT_LANGS["Latin"]
+
+    def language_for(self, img: Image.Image) -> str:
+        if self._cached_lang:
+            return self._cached_lang
+        lang = self.full_langs
+        script = detect_script(img) if settings.ocr_detect_script else None
+        if script and script["confidence"] >= settings.ocr_script_min_confidence:
+            cheap = SCRIPT_LANGS.get(script["script"])
+        else:
+            cheap = self._hint
+        if cheap and cheap in self.full_langs.split("+"):
+            lang = cheap
+        if lang == self._streak_lang:
+            self._streak += 1
+        else:
+            self._streak_lang, self._streak = lang, 1
+        if self._streak >= self.stable_after:
+            self._cached_lang = lang
+        return lang
+
+    def ocr(self, img: Image.Image) -> str:
+        """OCR one page image with the cheapest adequate language set."""
+        lang = self.language_for(img)
+        text = self._tesseract(img, lang)
+        if lang != self.full_langs and wordlike_ratio(text) < settings.ocr_min_wordlike_ratio:
+            # Cheap pass looked wrong (e.g. a Khmer page after English ones)
+            self._cached_lang = None
+            self._streak_lang, self._streak = None, 0
+            lang = self.full_langs
+            text = self._tesseract(img, lang)
+        self.observe(text)
+        self.decisions.append(lang)
+        return text
+
+    @staticmethod
+    def _tesseract(img: Image.Image, lang: str) -> str:
+        with tracer.start_as_current_span("tesseract.ocr", attributes={"ocr.lang": lang}):
+            return pytesseract.image_to_string(img, lang=lang)
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+
+from core.config import settings
+from core.tracing import tracer
+from services import trainer
+
+logger = logging.getLogger(__name__)
+
+Sample = Tuple[str, List[str]]
+
+
+class OnlineLearner:
+    """
+    Keeps a hashing-mode model current with the samples DataCollector appends
+    to training.jsonl, without a full retrain.
+
+    Each run reads the rows past a byte-offset cursor in mini-batches. Every
+    Nth sample (by text hash, see trainer.is_holdout) goes to a held-out file
+    instead of training. The rest are applied with partial_fit to a copy of
+    the live bundle. The copy is published as a new version only if its
+    micro-F1 on at least learner_min_holdout held-out samples is no more than
+    learner_max_f1_drop below the live model's.
+
+    A full train_model() starts a new lineage: its bundle records where in
+    training.jsonl it stopped reading, and the learner continues from there.
+    It also trains without the held-out rows and replaces the held-out file
+    with them. Runs hold trainer.model_lock, so a retrain waits for a run to
+    finish and a run never publishes over a fresh retrain.
+    """
+
+    @property
+    def versions_dir(self) -> str:
+        return os.path.join(os.path.dirname(settings.model_file), "versions")
+
+    @tracer.start_as_current_span("learner.run")
+    def run_once(self) -> Dict:
+        if not trainer.model_lock.acquire(blocking=False):
+            return {"status": "busy"}
+        try:
+            return self._run()
+        finally:
+            trainer.model_lock.release()
+
+    def _run(self) -> Dict:
+        if not trainer.model_ready():
+            return {"status": "unavailable", "reason": "No model trained yet"}
+        bundle = joblib.load(settings.model_file)
+        if bundle.get("mode") != "hashing":
+            return {"status": "unavailable", "reason": "Online updates need MODEL_VECTORIZER=hashing"}
+
+        state = self._load_state()
+        cursor = bundle["cursor"]
+        if state.get("model_id") == bundle["model_id"]:
+            # Rejected batches advance the state cursor but not the bundle's
+            cursor = max(cursor, state.get("cursor", 0))
+        if os.path.exists(settings.training_file) and os.path.getsize(settings.training_file) < cursor:
+            logger.warning("training.jsonl shrank below the learner cursor; retrain to resync")
+            return {"status": "unavailable", "reason": "Training file was truncated"}
+
+        rows, new_cursor = self._read_new_samples(cursor)
+        train, holdout = [], []
+        for sample in rows:
+            (holdout if trainer.is_holdout(sample[0]) else train).append(sample)
+        if len(train) < settings.learner_min_samples:
+            # Nothing is written, so the same rows are read again next run
+            return {"status": "idle", "version": bundle["version"], "pending": len(train)}
+        holdout_set = (self._load_holdout() + holdout)[-settings.learner_holdout_max:]
+        if len(holdout_set) < max(1, settings.learner_min_holdout):
+            # Too few samples to gate on; as above, the rows are read again later
+            return {"status": "idle", "version": bundle["version"], "pending": len(train), "holdout": len(holdout_set)}
+        if holdout:
+            self._append_holdout(holdout)
+
+        f1_before = self._evaluate(bundle, holdout_set)
+        # Updated in memory; the live file only changes in _publish
+        candidate = bundle
+        version = bundle["version"]
+        for start in range(0, len(train), settings.learner_batch_size):
+            batch = train[start:start + settings.learner_batch_size]
+            trainer.partial_update(candidate, [text for text, _ in batch], [labels for _, labels in batch])
+        f1_after = self._evaluate(candidate, holdout_set)
+
+        result = {
+            "samples": len(train),
+            "holdout": len(holdout_set),
+            "f1_before": f1_before,
+            "f1_after": f1_after,
+        }
+        if f1_after < f1_before - settings.learner_max_f1_drop:
+            self._save_state(bundle["model_id"], new_cursor, result)
+            logger.warning(f"Online update rejected: holdout F1 {f1_before:.3f} -> {f1_after:.3f}")
+            return {"status": "rejected", "version": version, **result}
+
+        candidate["version"] += 1
+        candidate["cursor"] = new_cursor
+        self._publish(candidate)
+        self._save_state(candidate["model_id"], new_cursor, result)
+        logger.info(f"Published online model version {candidate['version']} (+{len(train)} samples)")
+        return {"status": "published", "version": candidate["version"], **result}
+
+    def _read_new_samples(self, cursor: int) -> Tuple[List[Sample], int]:
+        """Complete lines after `cursor`; a line still being written is left for the next run."""
+        rows: List[Sample] = []
+        if not os.path.exists(settings.training_file):
+            return rows, cursor
+        with open(settings.training_file, "rb") as f:
+            f.seek(cursor)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                cursor += len(line)
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                if obj.get("text") and obj.get("labels"):
+                    rows.append((obj["text"], obj["labels"]))
+        return rows, cursor
+
+    @staticmethod
+    def _evaluate(bundle: Dict, samples: List[Sample]) -> float:
+        return trainer.evaluate_bundle(bundle, [text for text, _ in samples], [labels for _, labels in samples])
+
+    def _append_holdout(self, samples: List[Sample]) -> None:
+        with open(settings.learner_holdout_file, "a", encoding="utf-8") as f:
+            for text, labels in samples:
+                f.write(json.dumps({"text": text, "labels": labels}, ensure_ascii=False) + "\n")
+
+    def _load_holdout(self) -> List[Sample]:
+        if not os.path.exists(settings.learner_holdout_file):
+            return []
+        recent = deque(maxlen=settings.learner_holdout_max)
+        with open(settings.learner_holdout_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                recent.append((obj["text"], obj["labels"]))
+        return list(recent)
+
+    def _publish(self, bundle: Dict) -> None:
+        os.makedirs(self.versions_dir, exist_ok=True)
+        joblib.dump(bundle, os.path.join(self.versions_dir, f"model-{bundle['model_id'][:8]}-v{bundle['version']:04d}.joblib"))
+        trainer.save_bundle(bundle)
+        versions = sorted(
+            (os.path.join(self.versions_dir, name) for name in os.listdir(self.versions_dir)),
+            key=os.path.getmtime,
+        )
+        for old in versions[:-settings.learner_keep_versions]:
+            os.remove(old)
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(settings.learner_state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, model_id: str, cursor: int, result: Dict) -> None:
+        state = {
+            "model_id": model_id,
+            "cursor": cursor,
+            "updated_at": datetime.utcnow().isoformat(),
+            "last_result": result,
+        }
+        tmp_file = settings.learner_state_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, settings.learner_state_file)
+
+    async def run_forever(self, interval: Optional[float] = None) -> None:
+        """Background loop started from the app lifespan when learner_interval_seconds > 0."""
+        interval = interval or settings.learner_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.warning(f"Online learner run failed: {e}")
+
+
+online_learner = OnlineLearner()
@@ -1,26 +1,157 @@
-from typing import Dict, List, Optional
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 # Support both package and module execution
 from core.config import settings
+from core.metrics import MODEL_INFERENCE_SECONDS, QUEUE_DEPTH, ROUTING_DECISIONS
+from core.tracing import tracer
 from services.llm import LLMClient
-from services.trainer import append_training_example, predict_categories, model_ready
+from services.inference import get_model, model_ready
 from services.data_collector import collector
+from services.span_extractor import extract_spans, top_spans
 
 async def analyze_text(text: str, force_llm: Optional[bool] = None, filename: Optional[str] = None, file_hash: Optional[str] = None) -> Dict:
     use_llm = settings.use_llm if force_llm is None else bool(force_llm)
-    if model_ready() and not use_llm:
-        cats = predict_categories(text)
-        data = [
-            {
-                "risk": f"Potential {c} risk",
-                "category": c,
-                "context": "Predicted by local model based on text patterns.",
-            }
-            for c in cats
-        ]
-        return {"data": data, "source": "model"}
+    routing, cats = route_text(text, use_llm)
+    if routing["route"] == "model":
+        return {"data": _model_risks(text, cats), "source": "model", "routing": routing}
     client = LLMClient()
     risks = await client.analyze_risks(text)
+    _store_training_data(text, risks, filename, file_hash)
+    return {"data": risks, "source": "llm", "routing": routing}
+
+def route_text(text: str, use_llm: bool) -> Tuple[Dict, List[str]]:
+    """
+    Decide whether the local model can answer for `text` on its own.
+
+    The model runs first; its answer is kept when every category's
+    probability is at least settings.routing_min_confidence away from a
+    coin flip on either side (max(p, 1 - p)), otherwise the text goes to
+    the LLM. Returns the routing record stored with the result and the
+    model's categories (empty when routed to the LLM).
+    """
+    with tracer.start_as_current_span("pipeline.route") as span:
+        routing: Dict = {"route": "llm"}
+        cats: List[str] = []
+        model = None if use_llm or not model_ready() else get_model()
+        if use_llm:
+            routing["reason"] = "requested"
+        elif model is None:
+            routing["reason"] = "no_model"
+        else:
+            with MODEL_INFERENCE_SECONDS.time():
+                proba = model.predict_proba(text)
+            confidence = [max(p, 1.0 - p) for p in proba.tolist()]
+            uncertain = [
+                c for c, conf in zip(model.classes, confidence)
+                if conf < settings.routing_min_confidence
+            ]
+            routing["confidence"] = round(min(confidence, default=1.0), 4)
+            if uncertain and settings.routing_enabled:
+                routing["reason"] = "uncertain"
+                routing["uncertain"] = uncertain
+            else:
+                routing["route"] = "model"
+                routing["reason"] = "confident" if not uncertain else "routing_disabled"
+                cats = model.labels_from_proba(proba)
+            span.set_attribute("routing.confidence", routing["confidence"])
+        span.set_attribute("routing.route", routing["route"])
+        span.set_attribute("routing.reason", routing["reason"])
+    ROUTING_DECISIONS.labels(route=routing["route"], reason=routing["reason"]).inc()
+    return routing, cats
+
+async def analyze_pages(pages: AsyncIterator[str], force_llm: Optional[bool] = None, filename: Optional[str] = None, file_hash: Optional[str] = None) -> Dict:
+    """
+    Analyze a document while it is still being extracted.
+
+    Pages are packed into chunks of about settings.analysis_chunk_chars and
+    each chunk is analyzed as soon as it fills, so early pages are analyzed
+    while later ones are still being OCR'd. Every chunk is routed on its own
+    (see route_text): chunks the local model is sure about never reach the
+    LLM. Chunk results are merged and "source" is "model", "llm" or
+    "hybrid"; the full text is returned under "text".
+    """
+    use_llm = settings.use_llm if force_llm is None else bool(force_llm)
+    clients: List[LLMClient] = []
+    semaphore = asyncio.Semaphore(settings.analysis_max_concurrency)
+
+    async def analyze_chunk(chunk: str):
+        in_flight = QUEUE_DEPTH.labels(queue="analysis_chunks")
+        in_flight.inc()
+        try:
+            async with semaphore:
+                if use_llm:
+                    routing, cats = route_text(chunk, use_llm)
+                else:
+                    routing, cats = await asyncio.to_thread(route_text, chunk, use_llm)
+                if routing["route"] == "model":
+                    return chunk, routing, await asyncio.to_thread(_model_risks, chunk, cats)
+                if not clients:
+                    clients.append(LLMClient())
+                return chunk, routing, await clients[0].analyze_risks(chunk)
+        finally:
+            in_flight.dec()
+
+    tasks = []
+    all_pages: List[str] = []
+    chunk: List[str] = []
+    chunk_size = 0
+    try:
+        async for page in pages:
+            all_pages.append(page)
+            if not page.strip():
+                continue
+            chunk.append(page)
+            chunk_size += len(page)
+            if chunk_size >= settings.analysis_chunk_chars:
+                tasks.append(asyncio.create_task(analyze_chunk("\n".join(chunk))))
+                chunk, chunk_size = [], 0
+        if chunk:
+            tasks.append(asyncio.create_task(analyze_chunk("\n".join(chunk))))
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    text = "\n".join(all_pages)
+    routes = {routing["route"] for _, routing, _ in results}
+    if len(routes) > 1:
+        source = "hybrid"
+    elif routes:
+        source = routes.pop()
+    else:
+        source = "model" if model_ready() and not use_llm else "llm"
+    routing = {"route": source, "chunks": [r for _, r, _ in results]}
+
+    risks = []
+    seen = set()
+    model_items: Dict[str, List[Dict]] = {}
+    for chunk_text, chunk_routing, chunk_result in results:
+        if chunk_routing["route"] == "model":
+            for item in chunk_result:
+                model_items.setdefault(item["category"], []).append(item)
+            continue
+        for risk in chunk_result:
+            key = (str(risk.get("risk", "")).strip().lower(), risk.get("category"))
+            if key not in seen:
+                seen.add(key)
+                risks.append(risk)
+        if source == "hybrid":
+            # Only escalated chunks have LLM labels to learn from
+            _store_training_data(chunk_text, chunk_result, filename, file_hash)
+    if source == "llm":
+        _store_training_data(text, risks, filename, file_hash)
+    covered = {risk.get("category") for risk in risks}
+    for category in sorted(set(model_items) - covered):
+        risks.extend(top_spans(model_items[category]))
+    return {"data": risks, "source": source, "routing": routing, "text": text}
+
+def _model_risks(text: str, cats: List[str]) -> List[Dict]:
+    """Risk items for the model's categories, with the sentences that scored highest as context"""
+    with MODEL_INFERENCE_SECONDS.time():
+        return extract_spans(get_model(), text, cats)
+
+def _store_training_data(text: str, risks: List[Dict], filename: Optional[str], file_hash: Optional[str]) -> None:
     try:
         if risks:
             collector.collect(
@@ -30,8 +161,16 @@ async def analyze_text(text: str, force_llm: Optional[bool] = None, filename: Op
                 filename=filename,
                 file_hash=file_hash,
             )
+            # Imported here: the trainer pulls in scikit-learn, which the model path no longer needs
+            from services.trainer import append_training_example
             append_training_example(text, risks)
     except Exception as e:
         print(f"Warning: Failed to store training data: {e}")
         pass
-    return {"data": risks, "source": "llm"}
+
+def summarize_risks(risks: List[Dict]) -> Dict:
+    """Compact summary stored alongside each document so listings never parse analysis JSON."""
+    return {
+        "risk_count": len(risks),
+        "risk_categories": sorted({r.get("category", "Other") for r in risks}),
+    }
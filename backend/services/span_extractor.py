@@ -0,0 +1,83 @@
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from core.config import settings
+
+# Sentence boundaries: Khmer khan (U+17D4) and bariyoosan (U+17D5), which
+# need no following space, English terminators followed by whitespace (so
+# "0.5%" and "Art.3" stay whole), and line breaks.
+_BOUNDARY = re.compile(r"(?<=[។៕])\s*|(?<=[.!?])\s+|\s*\n\s*")
+
+SPAN_MIN_CHARS = 12  # Shorter fragments (headings, list markers) are not scored
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences and clauses of `text`, stripped, in order"""
+    return [
+        s.strip() for s in _BOUNDARY.split(text)
+        if len(s.strip()) >= SPAN_MIN_CHARS
+    ]
+
+
+def extract_spans(model, text: str, categories: List[str]) -> List[Dict]:
+    """
+    Risk items for `categories` backed by the sentences the local model
+    scores highest for each of them.
+
+    All sentences are scored with one predict_proba_batch call on the
+    compact (or bundle) model. Each category gets its settings.span_top_k
+    best sentences that clear the category's threshold, or its single best
+    sentence when none does (the document-level prediction already said the
+    category is present).
+    """
+    if not categories:
+        return []
+    sentences = split_sentences(text)
+    if len(sentences) > settings.span_max_sentences:
+        sentences = sentences[:settings.span_max_sentences]
+    if model is None or not sentences:
+        return [_item(c, None, None) for c in categories]
+
+    proba = model.predict_proba_batch(sentences)
+    column = {c: i for i, c in enumerate(model.classes)}
+    items = []
+    for category in categories:
+        j = column.get(category)
+        if j is None:
+            items.append(_item(category, None, None))
+            continue
+        scores = proba[:, j]
+        order = np.argsort(-scores, kind="stable")[:settings.span_top_k]
+        picked = [i for i in order if scores[i] > model.thresholds[j]] or order[:1].tolist()
+        items.extend(_item(category, sentences[i], float(scores[i])) for i in picked)
+    return items
+
+
+def top_spans(items: List[Dict]) -> List[Dict]:
+    """The settings.span_top_k most confident distinct items of one category, e.g. merged from chunks"""
+    ranked = sorted(items, key=lambda r: r.get("confidence", -1.0), reverse=True)
+    picked, seen = [], set()
+    for item in ranked:
+        if item["context"] not in seen:
+            seen.add(item["context"])
+            picked.append(item)
+    return picked[:settings.span_top_k]
+
+
+def _item(category: str, sentence, confidence) -> Dict:
+    if sentence is None:
+        return {
+            "risk": f"Potential {category} risk",
+            "category": category,
+            "context": "Predicted by local model based on text patterns.",
+        }
+    if len(sentence) > settings.span_max_chars:
+        sentence = sentence[:settings.span_max_chars].rstrip() + "…"
+    return {
+        "risk": f"Potential {category} risk",
+        "category": category,
+        "context": sentence,
+        "confidence": round(confidence, 3),
+    }
@@ -1,29 +1,51 @@
 import asyncio
 import os
+import time
 import uuid
 import logging
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple, Union
+import io
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from core.config import settings
+from core.metrics import record_cache
+from core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# Presigned URLs are re-issued this many seconds before they expire so a
+# client never receives a link that dies mid-download.
+PRESIGN_REFRESH_MARGIN = 300
+PRESIGN_CACHE_MAX_ENTRIES = 10_000
+
 
 class StorageService:
     def __init__(self):
         self.bucket_name = settings.s3_bucket_name
         self.region = settings.s3_region
         self.s3_client = self._create_s3_client()
+        # Objects above the threshold go up as multipart with parallel parts
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.s3_multipart_threshold,
+            multipart_chunksize=settings.s3_multipart_chunksize,
+            max_concurrency=settings.s3_max_concurrency,
+            use_threads=True,
+        )
+        # (s3_key, expires_in) -> (url, expires_at); LRU-bounded
+        self._url_cache: "OrderedDict[Tuple[str, int], Tuple[str, float]]" = OrderedDict()
 
     def _create_s3_client(self):
         config = Config(
             region_name=self.region,
             signature_version="s3v4",
             retries={"max_attempts": 3, "mode": "standard"},
+            max_pool_connections=max(settings.s3_max_pool_connections, settings.s3_max_concurrency),
         )
 
         # Build client kwargs
@@ -52,9 +74,10 @@ class StorageService:
         suffix = uuid.uuid4().hex[:12]
         return f"documents/{user_id}/{ts}_{suffix}_{safe}"
 
+    @tracer.start_as_current_span("storage.upload_file")
     async def upload_file(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         user_id: str,
         filename: str,
         content_type: str,
@@ -64,14 +87,13 @@ class StorageService:
     ) -> Tuple[str, str]:
         """
         Uploads an object and returns (s3_key, presigned_get_url).
+        Accepts raw bytes or a readable file object (e.g. UploadFile.file, a
+        SpooledTemporaryFile) which is streamed without buffering it whole.
         By default uses SSE-S3 (AES256). Optionally supports SSE-KMS.
         """
         s3_key = self._make_key(user_id, filename)
 
-        put_kwargs = {
-            "Bucket": self.bucket_name,
-            "Key": s3_key,
-            "Body": file_content,
+        extra_args = {
             "ContentType": content_type,
             "Metadata": metadata or {},
             # Better for common "download" UX (optional):
@@ -80,24 +102,48 @@ class StorageService:
 
         # Encryption
         if kms_key_id:
-            put_kwargs["ServerSideEncryption"] = "aws:kms"
-            put_kwargs["SSEKMSKeyId"] = kms_key_id
+            extra_args["ServerSideEncryption"] = "aws:kms"
+            extra_args["SSEKMSKeyId"] = kms_key_id
         else:
-            put_kwargs["ServerSideEncryption"] = "AES256"
+            extra_args["ServerSideEncryption"] = "AES256"
 
-        try:
-            await asyncio.to_thread(self.s3_client.put_object, **put_kwargs)
+        await self.upload_fileobj(file_content, s3_key, extra_args)
 
-            # Return a presigned URL rather than a "public URL"
-            url = await self.get_file_url(s3_key, expires_in=3600)
+        # Return a presigned URL rather than a "public URL"
+        url = await self.get_file_url(s3_key, expires_in=3600)
 
-            logger.info("File uploaded successfully: %s", s3_key)
-            return s3_key, url
+        logger.info("File uploaded successfully: %s", s3_key)
+        return s3_key, url
 
-        except ClientError:
+    @tracer.start_as_current_span("storage.upload_fileobj")
+    async def upload_fileobj(
+        self,
+        file_content: Union[bytes, BinaryIO],
+        s3_key: str,
+        extra_args: Optional[dict] = None,
+    ) -> None:
+        """
+        Streams an object to the bucket through the shared client.
+        Small bodies become a single PutObject; anything above
+        s3_multipart_threshold is sent as a multipart upload with
+        s3_max_concurrency parts in flight.
+        """
+        fileobj = io.BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+        try:
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
+                fileobj,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args or {},
+                Config=self.transfer_config,
+            )
+        except (ClientError, S3UploadFailedError):
             logger.exception("Error uploading file to S3 (key=%s)", s3_key)
             raise
+        self.invalidate_url(s3_key)
 
+    @tracer.start_as_current_span("storage.delete_file")
     async def delete_file(self, s3_key: str) -> bool:
         try:
             await asyncio.to_thread(
@@ -105,6 +151,7 @@ class StorageService:
                 Bucket=self.bucket_name,
                 Key=s3_key,
             )
+            self.invalidate_url(s3_key)
             logger.info("File deleted successfully: %s", s3_key)
             return True
 
@@ -112,17 +159,44 @@ class StorageService:
             logger.exception("Error deleting file from S3 (key=%s)", s3_key)
             raise
 
-    async def get_file_url(self, s3_key: str, expires_in: int = 3600) -> str:
+    def get_cached_url(self, s3_key: str, expires_in: int = 3600) -> str:
+        """
+        Return a presigned GET URL, reusing a cached one until shortly before it expires.
+        Presigning is a local HMAC computation, so a cache miss signs inline
+        instead of paying for a worker-thread hop.
+        """
+        cache_key = (s3_key, expires_in)
+        now = time.time()
+        cached = self._url_cache.get(cache_key)
+        if cached and cached[1] - now > min(PRESIGN_REFRESH_MARGIN, expires_in / 2):
+            self._url_cache.move_to_end(cache_key)
+            record_cache("presigned_url", True)
+            return cached[0]
+        record_cache("presigned_url", False)
+
         try:
-            return await asyncio.to_thread(
-                self.s3_client.generate_presigned_url,
-                "get_object",
-                Params={"Bucket": self.bucket_name, "Key": s3_key},
-                ExpiresIn=expires_in,
-            )
+            with tracer.start_as_current_span("storage.presign"):
+                url = self.s3_client.generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": self.bucket_name, "Key": s3_key},
+                    ExpiresIn=expires_in,
+                )
         except ClientError:
             logger.exception("Error generating presigned URL (key=%s)", s3_key)
             raise
 
+        self._url_cache[cache_key] = (url, now + expires_in)
+        self._url_cache.move_to_end(cache_key)
+        while len(self._url_cache) > PRESIGN_CACHE_MAX_ENTRIES:
+            self._url_cache.popitem(last=False)
+        return url
+
+    def invalidate_url(self, s3_key: str) -> None:
+        for cache_key in [k for k in self._url_cache if k[0] == s3_key]:
+            self._url_cache.pop(cache_key, None)
+
+    async def get_file_url(self, s3_key: str, expires_in: int = 3600) -> str:
+        return self.get_cached_url(s3_key, expires_in)
+
 
 storage_service = StorageService()
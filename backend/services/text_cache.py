@@ -0,0 +1,128 @@
+import logging
+import zlib
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.file_validator import calculate_file_hash
+from core.metrics import record_cache
+from core.tracing import traced_commit
+from db.tables import ExtractedText
+from services.ocr import EXTRACTOR_VERSION, aiter_document_pages, extractor_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class TextCacheService:
+    """
+    Persistent cache of extracted document text, keyed by SHA-256 of the file.
+    Re-scans, retraining and model/LLM switches reuse the stored text instead
+    of re-running PDF parsing and Tesseract. Rows extracted by another
+    extractor version or other OCR settings (see extractor_fingerprint)
+    count as misses and are overwritten.
+    """
+
+    @staticmethod
+    def file_hash(content: bytes) -> str:
+        return calculate_file_hash(content)
+
+    @staticmethod
+    def _cache_session(db: AsyncSession) -> AsyncSession:
+        """
+        Short-lived session on the request session's engine. Cache errors are
+        rolled back here, never on the caller's session, whose loaded objects
+        (the current user, the document being re-scanned) a rollback would expire.
+        """
+        return AsyncSession(db.bind, expire_on_commit=False, autoflush=False)
+
+    async def get(self, db: AsyncSession, file_hash: str) -> Optional[Dict]:
+        result = await db.execute(
+            select(ExtractedText).where(ExtractedText.file_hash == file_hash)
+        )
+        row = result.scalar_one_or_none()
+        if row is None or row.extractor_fingerprint != extractor_fingerprint():
+            return None
+        return {
+            "text": zlib.decompress(row.text_zlib).decode("utf-8"),
+            "engine": row.engine,
+            "language": row.language,
+            "page_count": row.page_count,
+            "pages_ocr": row.pages_ocr,
+            "duration_ms": row.duration_ms,
+            "cached": True,
+        }
+
+    async def put(self, db: AsyncSession, file_hash: str, extraction: Dict) -> None:
+        text = extraction.get("text") or ""
+        row = ExtractedText(
+            file_hash=file_hash,
+            extractor_version=EXTRACTOR_VERSION,
+            extractor_fingerprint=extractor_fingerprint(),
+            text_zlib=zlib.compress(text.encode("utf-8"), 6),
+            text_length=len(text),
+            engine=extraction.get("engine", "unknown"),
+            language=extraction.get("language"),
+            page_count=extraction.get("page_count", 1),
+            pages_ocr=extraction.get("pages_ocr", 0),
+            duration_ms=extraction.get("duration_ms", 0),
+        )
+        # Best effort: a concurrent scan of the same file may have won the insert
+        async with self._cache_session(db) as cache_db:
+            try:
+                await cache_db.merge(row)
+                with traced_commit("text_cache"):
+                    await cache_db.commit()
+            except Exception as e:
+                logger.warning(f"Failed to cache extracted text {file_hash}: {e}")
+                await cache_db.rollback()
+
+    async def _lookup(self, db: AsyncSession, file_hash: str) -> Optional[Dict]:
+        async with self._cache_session(db) as cache_db:
+            try:
+                cached = await self.get(cache_db, file_hash)
+            except Exception as e:
+                logger.warning(f"Extracted text cache unavailable: {e}")
+                cached = None
+        record_cache("extracted_text", cached is not None)
+        return cached
+
+    async def iter_pages(
+        self,
+        db: AsyncSession,
+        content: Union[bytes, Callable[[], Awaitable[bytes]]],
+        filename: Optional[str],
+        extraction: Dict,
+        file_hash: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield a document's text page by page, from the cache when possible.
+        A hit yields the stored text as one page; a miss yields pages as the
+        extractor produces them and caches the joined text once the last page
+        is done. `extraction` is filled with the text, the extraction
+        metadata (engine, page_count, pages_ocr, language, duration_ms) and
+        "cached".
+
+        `content` may instead be a coroutine function returning the bytes
+        (with `file_hash` given); it is only awaited on a miss, so a re-scan
+        of cached text never fetches the stored object.
+        """
+        file_hash = file_hash or self.file_hash(content)
+        cached = await self._lookup(db, file_hash)
+        if cached is not None:
+            extraction.update(cached)
+            yield cached["text"]
+            return
+        if callable(content):
+            content = await content()
+        pages = []
+        async for page in aiter_document_pages(content, filename, extraction):
+            pages.append(page)
+            yield page
+        extraction["text"] = "\n".join(pages)
+        if extraction["text"]:
+            await self.put(db, file_hash, extraction)
+        extraction["cached"] = False
+
+
+text_cache_service = TextCacheService()
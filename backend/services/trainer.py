@@ -1,19 +1,30 @@
+import hashlib
 import json
 import os
+import shutil
+import tempfile
+import threading
+import uuid
 from typing import List, Dict, Tuple
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, KFold, RandomizedSearchCV, train_test_split
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.multiclass import OneVsRestClassifier
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.pipeline import Pipeline, make_pipeline
 from sklearn.preprocessing import MultiLabelBinarizer
 from sklearn.metrics import f1_score, accuracy_score
 from scipy.sparse import hstack, csr_matrix
 import joblib
+from joblib import parallel_backend
 
 # Support both package and module execution
 from core.config import settings
+# model_ready and predict_categories live in services.inference; imported here for existing callers
+from services.inference import artifact_dir, model_ready, predict_categories
+from services.model_artifact import export_artifact, remove_artifact
 
 CATEGORIES = [
     "Financial",
@@ -25,6 +36,28 @@ CATEGORIES = [
     "Other",
 ]
 
+# partial_fit needs every label's classes up front, including on the first batch
+BINARY_CLASSES = [np.array([0, 1])] * len(CATEGORIES)
+
+# Search space for settings.model_search (TF-IDF mode)
+SEARCH_GRID = {
+    "vectorizer__ngram_range": [(1, 1), (1, 2)],
+    "vectorizer__max_features": [20000, 50000],
+    "vectorizer__min_df": [1, 2],
+    "vectorizer__sublinear_tf": [False, True],
+    "classifier__estimator__C": [0.5, 1.0, 4.0, 16.0],
+    "classifier__estimator__class_weight": [None, "balanced"],
+}
+
+# Held while train_model, update_model or an online learner run rewrites the
+# live bundle, so one can never overwrite a bundle the other just published
+model_lock = threading.Lock()
+
+def is_holdout(text: str) -> bool:
+    """Whether `text` is in the online learner's gate set: every learner_holdout_every-th sample by text hash"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % settings.learner_holdout_every == 0
+
 def append_training_example(text: str, risks: List[Dict]):
     labels = sorted({r.get("category", "Other") for r in risks})
     rec = {"text": text, "labels": labels, "raw": risks}
@@ -69,18 +102,44 @@ def _load_training_df() -> pd.DataFrame:
     return df
 
 def train_model() -> Tuple[float, float]:
+    with model_lock:
+        return _train_model()
+
+def _train_model() -> Tuple[float, float]:
+    # Measured before reading, so the online learner resumes no later than this
+    trained_through = os.path.getsize(settings.training_file) if os.path.exists(settings.training_file) else 0
     df = _load_training_df()
     if df.empty:
         raise RuntimeError("No training data available.")
     X_text = df["text"].tolist()
     y_labels = df["labels"].tolist()
-    use_metadata = df.get("has_metadata", pd.Series([False])).iloc[0] if len(df) > 0 else False
+    if settings.model_vectorizer == "hashing":
+        # The online learner gates updates on these rows, so they must stay
+        # unseen; they start the new lineage's holdout file
+        held_out = [is_holdout(text) for text in X_text]
+        _write_holdout([(t, l) for t, l, h in zip(X_text, y_labels, held_out) if h])
+        X_text = [t for t, h in zip(X_text, held_out) if not h]
+        y_labels = [l for l, h in zip(y_labels, held_out) if not h]
+    use_metadata = bool(df.get("has_metadata", pd.Series([False])).iloc[0]) if len(df) > 0 else False
     mlb = MultiLabelBinarizer(classes=CATEGORIES)
     Y = mlb.fit_transform(y_labels)
     X_train_text, X_test_text, Y_train, Y_test = train_test_split(
         X_text, Y, test_size=0.2, random_state=42
     )
-    vectorizer = TfidfVectorizer(max_features=20000, ngram_range=(1, 2))
+    if settings.model_vectorizer == "hashing":
+        return _train_hashing_model(X_train_text, X_test_text, Y_train, Y_test, mlb, trained_through)
+    vectorizer_params = {"max_features": 20000, "ngram_range": (1, 2)}
+    classifier_params = {"max_iter": 200}
+    search = None
+    if settings.model_search:
+        search = search_hyperparameters(X_train_text, Y_train)
+        for key, value in search["best_params"].items():
+            step, _, name = key.partition("__")
+            if step == "vectorizer":
+                vectorizer_params[name] = value
+            else:
+                classifier_params[name.replace("estimator__", "", 1)] = value
+    vectorizer = TfidfVectorizer(**vectorizer_params)
     X_train_tfidf = vectorizer.fit_transform(X_train_text)
     X_test_tfidf = vectorizer.transform(X_test_text)
     if use_metadata:
@@ -97,27 +156,176 @@ def train_model() -> Tuple[float, float]:
         print("Training with text features only...")
         X_train_final = X_train_tfidf
         X_test_final = X_test_tfidf
-    base_clf = LogisticRegression(max_iter=200)
+    base_clf = LogisticRegression(**classifier_params)
     clf = OneVsRestClassifier(base_clf)
     clf.fit(X_train_final, Y_train)
     Y_pred = clf.predict(X_test_final)
     acc = accuracy_score(Y_test, Y_pred)
     f1 = f1_score(Y_test, Y_pred, average="micro")
+    per_category = _per_category_f1(Y_test, Y_pred)
     model_bundle = {
         "vectorizer": vectorizer,
         "classifier": clf,
         "mlb": mlb,
         "use_metadata": use_metadata,
     }
-    joblib.dump(model_bundle, settings.model_file)
+    save_bundle(model_bundle)
     with open(settings.metrics_file, "w", encoding="utf-8") as f:
         json.dump({
             "accuracy": acc,
             "f1_micro": f1,
+            "f1_per_category": per_category,
             "use_metadata": use_metadata,
+            "search": search,
+        }, f, indent=2)
+    return acc, f1
+
+def search_hyperparameters(X_text: List[str], Y: np.ndarray) -> Dict:
+    """
+    Cross-validated grid (or random, per settings.model_search) search over
+    SEARCH_GRID, scored by micro-F1 and run on loky worker processes.
+    The pipeline caches fitted vectorizers on disk, so candidates that only
+    differ in classifier settings reuse the vectorizer fitted for that fold.
+    """
+    cache_dir = tempfile.mkdtemp(prefix="haniphei-search-")
+    try:
+        pipeline = Pipeline(
+            [
+                ("vectorizer", TfidfVectorizer()),
+                ("classifier", OneVsRestClassifier(LogisticRegression(max_iter=200))),
+            ],
+            memory=cache_dir,
+        )
+        cv = KFold(n_splits=settings.model_search_folds, shuffle=True, random_state=42)
+        if settings.model_search == "random":
+            search = RandomizedSearchCV(
+                pipeline, SEARCH_GRID, n_iter=settings.model_search_iter, cv=cv,
+                scoring="f1_micro", n_jobs=settings.model_search_jobs, random_state=42,
+            )
+        else:
+            search = GridSearchCV(
+                pipeline, SEARCH_GRID, cv=cv, scoring="f1_micro", n_jobs=settings.model_search_jobs,
+            )
+        print(f"Running {settings.model_search or 'grid'} search with {settings.model_search_folds}-fold CV...")
+        with parallel_backend("loky", n_jobs=settings.model_search_jobs):
+            search.fit(X_text, Y)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {
+        "strategy": settings.model_search,
+        "best_params": search.best_params_,
+        "best_cv_f1_micro": float(search.best_score_),
+        "candidates": len(search.cv_results_["params"]),
+        "folds": settings.model_search_folds,
+    }
+
+def _per_category_f1(Y_true: np.ndarray, Y_pred: np.ndarray) -> Dict[str, float]:
+    scores = f1_score(Y_true, Y_pred, average=None, zero_division=0)
+    return {category: float(score) for category, score in zip(CATEGORIES, scores)}
+
+def _train_hashing_model(X_train_text, X_test_text, Y_train, Y_test, mlb, trained_through: int) -> Tuple[float, float]:
+    """
+    Fixed-size variant: hashed 1-2 grams, TF-IDF weighting and one SGD
+    logistic regression per category. The bundle holds no vocabulary, and
+    update_model() can fold in new samples with partial_fit.
+    `trained_through` is the training.jsonl byte offset the online learner
+    continues from; it is stored as the bundle's "cursor".
+    """
+    print("Training hashing model...")
+    vectorizer = make_pipeline(
+        HashingVectorizer(
+            n_features=settings.model_hash_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None,
+        ),
+        TfidfTransformer(),
+    )
+    X_train = vectorizer.fit_transform(X_train_text)
+    X_test = vectorizer.transform(X_test_text)
+    clf = MultiOutputClassifier(SGDClassifier(loss="log_loss", random_state=42))
+    rng = np.random.RandomState(42)
+    for _ in range(settings.model_sgd_epochs):
+        order = rng.permutation(X_train.shape[0])
+        clf.partial_fit(X_train[order], Y_train[order], classes=BINARY_CLASSES)
+    Y_pred = clf.predict(X_test)
+    acc = accuracy_score(Y_test, Y_pred)
+    f1 = f1_score(Y_test, Y_pred, average="micro")
+    per_category = _per_category_f1(Y_test, Y_pred)
+    save_bundle({
+        "vectorizer": vectorizer,
+        "classifier": clf,
+        "mlb": mlb,
+        "use_metadata": False,
+        "mode": "hashing",
+        "samples_seen": X_train.shape[0],
+        "model_id": uuid.uuid4().hex,
+        "version": 0,
+        "cursor": trained_through,
+    })
+    with open(settings.metrics_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "accuracy": acc,
+            "f1_micro": f1,
+            "f1_per_category": per_category,
+            "use_metadata": False,
+            "mode": "hashing",
         }, f, indent=2)
     return acc, f1
 
+def update_model(texts: List[str], labels: List[List[str]]) -> int:
+    """
+    Fold new samples into a hashing-mode model without a full retrain.
+    The IDF weights stay as fitted by the last train_model() call.
+    Returns the number of samples applied.
+    """
+    if not model_ready():
+        raise RuntimeError("No model to update; train one first.")
+    with model_lock:
+        bundle = joblib.load(settings.model_file)
+        if bundle.get("mode") != "hashing":
+            raise RuntimeError("Incremental updates need a model trained with model_vectorizer='hashing'.")
+        if not texts:
+            return 0
+        partial_update(bundle, texts, labels)
+        save_bundle(bundle)
+    return len(texts)
+
+def partial_update(bundle: Dict, texts: List[str], labels: List[List[str]]) -> None:
+    """One partial_fit step on an in-memory hashing bundle"""
+    X = bundle["vectorizer"].transform(texts)
+    Y = bundle["mlb"].transform(labels)
+    bundle["classifier"].partial_fit(X, Y, classes=BINARY_CLASSES)
+    bundle["samples_seen"] += len(texts)
+
+def evaluate_bundle(bundle: Dict, texts: List[str], labels: List[List[str]]) -> float:
+    """Micro-F1 of a bundle's text-only predictions"""
+    Y_true = bundle["mlb"].transform(labels)
+    Y_pred = bundle["classifier"].predict(bundle["vectorizer"].transform(texts))
+    return float(f1_score(Y_true, Y_pred, average="micro", zero_division=0))
+
+def _write_holdout(samples: List[Tuple[str, List[str]]]) -> None:
+    """Replace the learner's holdout file, e.g. with a new lineage's held-out training rows"""
+    tmp_file = settings.learner_holdout_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        for text, labels in samples:
+            f.write(json.dumps({"text": text, "labels": labels}, ensure_ascii=False) + "\n")
+    os.replace(tmp_file, settings.learner_holdout_file)
+
+def save_bundle(bundle: Dict) -> None:
+    # Write then rename so a concurrent predict never loads a half-written file
+    tmp_file = settings.model_file + ".tmp"
+    joblib.dump(bundle, tmp_file)
+    os.replace(tmp_file, settings.model_file)
+    if not settings.model_compact:
+        return
+    try:
+        export_artifact(bundle, artifact_dir(), source_stamp=os.stat(settings.model_file).st_mtime_ns)
+    except ValueError as e:
+        # Predictions fall back to the joblib bundle
+        print(f"Warning: compact model export skipped: {e}")
+        remove_artifact(artifact_dir())
+
 def _extract_feature_vectors(df_subset: pd.DataFrame) -> np.ndarray:
     feature_vectors = []
     for idx, row in df_subset.iterrows():
@@ -154,17 +362,3 @@ def _extract_feature_vectors(df_subset: pd.DataFrame) -> np.ndarray:
         feature_vectors.append(feature_vec)
     return np.array(feature_vectors)
 
-def model_ready() -> bool:
-    return os.path.exists(settings.model_file)
-
-def predict_categories(text: str) -> List[str]:
-    if not model_ready():
-        return []
-    bundle = joblib.load(settings.model_file)
-    vectorizer = bundle["vectorizer"]
-    clf = bundle["classifier"]
-    mlb = bundle["mlb"]
-    X_vec = vectorizer.transform([text])
-    Y_pred = clf.predict(X_vec)
-    labels = mlb.inverse_transform(Y_pred)
-    return sorted(labels[0]) if labels else []
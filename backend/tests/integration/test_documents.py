@@ -0,0 +1,129 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import quote
+
+import fitz
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from controllers import document as document_controller
+from db.tables import Document, User
+from services.object_store import LocalObjectStore
+
+
+class StreamingOnlyStore(LocalObjectStore):
+    """Local bytes served through the streaming (S3) branch of the download route"""
+
+    def local_path(self, key):
+        return None
+
+
+async def _add_document(db_session: AsyncSession, user: User, name: str = "contract.pdf", created_at: Optional[datetime] = None) -> Document:
+    doc = Document(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        filename=name,
+        original_filename=name,
+        file_type="pdf",
+        file_size=7,
+        s3_key=f"scans/{user.id}/{uuid.uuid4()}",
+    )
+    if created_at is not None:
+        doc.created_at = created_at
+    db_session.add(doc)
+    await db_session.commit()
+    return doc
+
+
+@pytest.mark.anyio
+async def test_local_backend_links_to_download_route(auth_client: AsyncClient, db_session: AsyncSession, user: User, tmp_path, monkeypatch):
+    """Test that the local backend serves the download route as s3_url instead of presigning S3."""
+    monkeypatch.setattr(document_controller, "object_store", LocalObjectStore(str(tmp_path)))
+    doc = await _add_document(db_session, user)
+
+    response = await auth_client.get(f"/api/documents/{doc.id}")
+
+    assert response.status_code == 200
+    assert response.json()["s3_url"] == f"/api/documents/{doc.id}/download"
+
+
+@pytest.mark.anyio
+async def test_download_streams_non_ascii_filename(auth_client: AsyncClient, db_session: AsyncSession, user: User, tmp_path, monkeypatch):
+    """Test that a Khmer filename with a quote is sent as RFC 5987 filename* with an ASCII fallback."""
+    store = StreamingOnlyStore(str(tmp_path))
+    monkeypatch.setattr(document_controller, "object_store", store)
+    name = 'កិច្ចសន្យា "final".pdf'
+    doc = await _add_document(db_session, user, name)
+    await store.put(doc.s3_key, b"%PDF-1.", "application/pdf")
+
+    response = await auth_client.get(f"/api/documents/{doc.id}/download")
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1."
+    disposition = response.headers["content-disposition"]
+    assert disposition == (
+        'attachment; filename="__________ _final_.pdf"; '
+        f"filename*=utf-8''{quote(name, safe='')}"
+    )
+    assert disposition.isascii()
+
+
+@pytest.mark.anyio
+async def test_list_pages_by_cursor_across_equal_timestamps(auth_client: AsyncClient, db_session: AsyncSession, user: User, tmp_path, monkeypatch):
+    """Test that cursor paging visits every document once, newest first, even when created_at ties."""
+    monkeypatch.setattr(document_controller, "object_store", LocalObjectStore(str(tmp_path)))
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    times = [base, base, base, base + timedelta(minutes=1), base - timedelta(minutes=1)]
+    docs = [await _add_document(db_session, user, created_at=t) for t in times]
+    expected = [str(d.id) for d in sorted(docs, key=lambda d: (d.created_at, d.id.hex), reverse=True)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, "include_total": "false", **({"cursor": cursor} if cursor else {})}
+        response = await auth_client.get("/api/documents", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert page["total"] is None
+        pages += 1
+        seen.extend(doc["id"] for doc in page["documents"])
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+
+    assert seen == expected
+    assert pages == 3
+
+    response = await auth_client.get("/api/documents", params={"limit": 2})
+    assert response.json()["total"] == 5
+
+
+@pytest.mark.anyio
+async def test_list_rejects_malformed_cursor(auth_client: AsyncClient):
+    """Test that a cursor that does not decode is a client error."""
+    response = await auth_client.get("/api/documents", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_upload_streams_the_validated_file_to_the_store(auth_client: AsyncClient, db_session: AsyncSession, tmp_path, monkeypatch):
+    """Test that an uploaded document is stored byte for byte and recorded with its size and hash."""
+    store = LocalObjectStore(str(tmp_path))
+    monkeypatch.setattr(document_controller, "object_store", store)
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), "Payment is due within 30 days.")
+    content = pdf.tobytes()
+    pdf.close()
+
+    response = await auth_client.post("/api/documents", files={"file": ("contract.pdf", content, "application/pdf")})
+
+    assert response.status_code == 201
+    doc = (await db_session.execute(select(Document))).scalars().one()
+    assert doc.file_size == len(content)
+    assert doc.sha256 == hashlib.sha256(content).hexdigest()
+    assert await store.get(doc.s3_key) == content
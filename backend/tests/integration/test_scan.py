@@ -0,0 +1,153 @@
+import uuid
+from typing import Optional
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from controllers import scan
+from core.config import settings
+from db.tables import Analysis, Document, User
+from services import pipeline
+from services.object_store import LocalObjectStore
+from services.text_cache import text_cache_service
+
+
+class FakeClient:
+    async def analyze_risks(self, text):
+        return [{"risk": "Late payment", "category": "Financial", "context": text}]
+
+
+@pytest.fixture
+def scan_env(tmp_path, monkeypatch):
+    """Scans analyzed by a fake LLM with inputs stored on local disk."""
+    store = LocalObjectStore(str(tmp_path / "objects"))
+    monkeypatch.setattr(scan, "object_store", store)
+    monkeypatch.setattr(pipeline, "LLMClient", FakeClient)
+    monkeypatch.setattr(pipeline, "model_ready", lambda: False)
+    monkeypatch.setattr(pipeline, "_store_training_data", lambda *args: None)
+    return store
+
+
+@pytest.mark.anyio
+async def test_scan_succeeds_when_text_cache_write_fails(auth_client: AsyncClient, db_session: AsyncSession, scan_env, monkeypatch):
+    """Test that a failing extracted-text cache write does not fail the scan or expire the user."""
+    async def failing_merge(self, instance, **kwargs):
+        raise RuntimeError("duplicate key value violates unique constraint")
+
+    monkeypatch.setattr(AsyncSession, "merge", failing_merge)
+
+    response = await auth_client.post(
+        "/api/scan",
+        files={"file": ("contract.txt", b"Payment is due within 30 days of invoice.", "text/plain")},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["scan_id"] is not None
+    assert body["risk_count"] == 1
+    documents = (await db_session.execute(select(Document))).scalars().all()
+    assert [str(d.id) for d in documents] == [body["scan_id"]]
+    assert documents[0].sha256 == text_cache_service.file_hash(b"Payment is due within 30 days of invoice.")
+
+
+async def _add_scan(db_session: AsyncSession, owner: User, store: LocalObjectStore, content: Optional[bytes]) -> Document:
+    """A scanned document with one earlier analysis and, unless content is None, its stored bytes."""
+    doc = Document(
+        id=uuid.uuid4(),
+        user_id=owner.id,
+        filename="contract.txt",
+        original_filename="contract.txt",
+        file_type="text",
+        file_size=len(content or b""),
+        s3_key=f"scans/{owner.id}/{uuid.uuid4()}",
+        risk_count=0,
+        risk_categories=[],
+        analysis_source="model",
+    )
+    db_session.add(doc)
+    db_session.add(Analysis(id=uuid.uuid4(), document_id=doc.id, data=[], source="model"))
+    await db_session.commit()
+    if content is not None:
+        await store.put(doc.s3_key, content, "text/plain")
+    return doc
+
+
+@pytest.mark.anyio
+async def test_rescan_appends_analysis_and_updates_summary(auth_client: AsyncClient, db_session: AsyncSession, user: User, scan_env):
+    """Test that a rescan keeps the earlier analysis, adds a new one and moves the summary columns."""
+    doc = await _add_scan(db_session, user, scan_env, b"Payment is due within 30 days of invoice.")
+
+    response = await auth_client.post(f"/api/scan/{doc.id}/rescan")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["scan_id"] == str(doc.id)
+    assert body["source"] == "llm"
+    assert body["risk_count"] == 1
+    analyses = (await db_session.execute(
+        select(Analysis).where(Analysis.document_id == doc.id)
+    )).scalars().all()
+    assert len(analyses) == 2
+    assert body["analysis_id"] in {str(a.id) for a in analyses}
+    await db_session.refresh(doc)
+    assert doc.risk_count == 1
+    assert doc.risk_categories == ["Financial"]
+    assert doc.analysis_source == "llm"
+    assert doc.analyzed_at is not None
+    assert doc.sha256 == text_cache_service.file_hash(b"Payment is due within 30 days of invoice.")
+
+
+@pytest.mark.anyio
+async def test_rescan_of_cached_text_skips_the_object_store(auth_client: AsyncClient, db_session: AsyncSession, user: User, scan_env):
+    """Test that a document whose text is cached under its sha256 is re-analyzed without its stored bytes."""
+    content = b"Payment is due within 30 days of invoice."
+    doc = await _add_scan(db_session, user, scan_env, None)
+    doc.sha256 = text_cache_service.file_hash(content)
+    await db_session.commit()
+    await text_cache_service.put(db_session, doc.sha256, {"text": content.decode(), "engine": "text"})
+
+    response = await auth_client.post(f"/api/scan/{doc.id}/rescan")
+
+    assert response.status_code == 200
+    assert response.json()["risk_count"] == 1
+
+
+@pytest.mark.anyio
+async def test_rescan_of_another_users_document_is_not_found(auth_client: AsyncClient, db_session: AsyncSession, scan_env):
+    """Test that a document owned by someone else is reported as missing."""
+    other = User(email="other@example.com", password_hash="not-a-real-hash")
+    db_session.add(other)
+    await db_session.commit()
+    doc = await _add_scan(db_session, other, scan_env, b"Payment is due within 30 days of invoice.")
+
+    response = await auth_client.post(f"/api/scan/{doc.id}/rescan")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_rescan_without_stored_content_conflicts(auth_client: AsyncClient, db_session: AsyncSession, user: User, scan_env):
+    """Test that a document whose stored bytes are gone asks for a re-upload."""
+    doc = await _add_scan(db_session, user, scan_env, None)
+
+    response = await auth_client.post(f"/api/scan/{doc.id}/rescan")
+
+    assert response.status_code == 409
+    analyses = (await db_session.execute(
+        select(Analysis).where(Analysis.document_id == doc.id)
+    )).scalars().all()
+    assert len(analyses) == 1
+
+
+@pytest.mark.anyio
+async def test_text_cache_misses_after_ocr_settings_change(db_session: AsyncSession, monkeypatch):
+    """Test that text extracted under other OCR settings is not served from the cache."""
+    file_hash = text_cache_service.file_hash(b"scanned contract")
+    await text_cache_service.put(db_session, file_hash, {"text": "Payment is due.", "engine": "ocr"})
+    assert (await text_cache_service.get(db_session, file_hash))["text"] == "Payment is due."
+
+    monkeypatch.setattr(settings, "tesseract_lang", "eng")
+
+    assert await text_cache_service.get(db_session, file_hash) is None
@@ -0,0 +1,90 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.tables import Analysis, Document, User
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _document(owner: User, created_at: datetime, **summary) -> Document:
+    return Document(
+        id=uuid.uuid4(),
+        user_id=owner.id,
+        filename="contract.pdf",
+        original_filename="contract.pdf",
+        file_type="pdf",
+        file_size=1,
+        s3_key=f"scans/{owner.id}/{uuid.uuid4()}",
+        created_at=created_at,
+        **summary,
+    )
+
+
+@pytest.mark.anyio
+async def test_history_pages_by_keyset_across_equal_timestamps(auth_client: AsyncClient, db_session: AsyncSession, user: User):
+    """Test that paging visits every scan once, newest first, even when created_at ties."""
+    times = [BASE_TIME, BASE_TIME, BASE_TIME, BASE_TIME + timedelta(minutes=1), BASE_TIME - timedelta(minutes=1)]
+    other = User(email="other@example.com", password_hash="not-a-real-hash")
+    db_session.add(other)
+    await db_session.commit()
+    docs = [_document(user, t, risk_count=0, risk_categories=[], analysis_source="model") for t in times]
+    db_session.add_all(docs + [_document(other, BASE_TIME, risk_count=0)])
+    await db_session.commit()
+    expected = [str(d.id) for d in sorted(docs, key=lambda d: (d.created_at, d.id.hex), reverse=True)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await auth_client.get("/api/scan/history", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages += 1
+        seen.extend(scan["id"] for scan in page["scans"])
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+
+    assert seen == expected
+    assert pages == 3
+
+
+@pytest.mark.anyio
+async def test_history_rejects_malformed_cursor(auth_client: AsyncClient):
+    """Test that a cursor that does not decode is a client error."""
+    response = await auth_client.get("/api/scan/history", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_history_backfills_legacy_rows_from_latest_analysis(auth_client: AsyncClient, db_session: AsyncSession, user: User):
+    """Test that a scan without materialized summary columns is summarized from its newest analysis."""
+    doc = _document(user, BASE_TIME)
+    db_session.add(doc)
+    db_session.add_all([
+        Analysis(
+            id=uuid.uuid4(), document_id=doc.id, source="model", created_at=BASE_TIME,
+            data=[{"risk": "Old", "category": "Legal", "context": ""}],
+        ),
+        Analysis(
+            id=uuid.uuid4(), document_id=doc.id, source="llm", created_at=BASE_TIME + timedelta(hours=1),
+            data=[
+                {"risk": "Late payment", "category": "Financial", "context": ""},
+                {"risk": "Delay", "category": "Schedule", "context": ""},
+            ],
+        ),
+    ])
+    await db_session.commit()
+
+    response = await auth_client.get("/api/scan/history")
+
+    assert response.status_code == 200
+    [scan] = response.json()["scans"]
+    assert scan["risk_count"] == 2
+    assert scan["risk_categories"] == ["Financial", "Schedule"]
+    assert scan["analysis_source"] == "llm"
@@ -0,0 +1,46 @@
+"""
+Synthetic contract samples shared by the unit tests and the benchmarks, so
+every model they train sees the same phrasing.
+"""
+from typing import Iterable, Optional, Tuple
+
+# One template per category; {n} varies the samples
+TRAINING_EXAMPLES = {
+    "Financial": "Payment of {n}% is due on signing and interest accrues on late invoices.",
+    "Schedule": "The works must be completed within {n} days or a daily penalty applies.",
+    "Technical": "The design must meet load specification {n} and pass structural tests.",
+    "Legal": "Either party may terminate with {n} days notice under the governing law.",
+    "Operational": "The site must be staffed by {n} supervisors during operating hours.",
+    "Compliance": "All work must comply with regulation {n} and environmental permits.",
+    "Other": "Miscellaneous provision {n} applies to matters not covered elsewhere.",
+}
+
+
+def append_samples(
+    numbers: Iterable[int],
+    extra_labels: Iterable[str] = (),
+    categories: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Append one training.jsonl row per category (all of TRAINING_EXAMPLES
+    unless `categories` is given) for each n, labelled with the category
+    plus extra_labels.
+    """
+    # Imported here: the scan benchmark sets up settings through the environment before the app loads
+    from services import trainer
+
+    extra_labels = tuple(extra_labels)
+    categories = list(TRAINING_EXAMPLES) if categories is None else list(categories)
+    for n in numbers:
+        for category in categories:
+            template = TRAINING_EXAMPLES[category]
+            risks = [{"category": label} for label in (category, *extra_labels)]
+            trainer.append_training_example(template.format(n=n), risks)
+
+
+def train_sample_model(samples: int = 12) -> Tuple[float, float]:
+    """Append `samples` rows per category to settings.training_file and train the model on them"""
+    from services import trainer
+
+    append_samples(range(samples))
+    return trainer.train_model()
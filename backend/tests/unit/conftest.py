@@ -0,0 +1,34 @@
+from functools import partial
+
+import pytest
+
+from core.config import settings
+from tests.training_samples import append_samples as _append_all_samples
+
+# Fewer classes keep the models trained on ten samples each confident
+UNIT_CATEGORIES = ("Financial", "Schedule", "Legal", "Compliance")
+_append_samples = partial(_append_all_samples, categories=UNIT_CATEGORIES)
+
+
+@pytest.fixture
+def append_samples():
+    """Append one training.jsonl row per category for each n in the given numbers, plus any extra_labels."""
+    return _append_samples
+
+
+@pytest.fixture
+def model_settings(tmp_path, monkeypatch):
+    """Training, model, metrics and learner files under tmp_path, seeded with ten samples per category."""
+    for name, filename in [
+        ("training_file", "training.jsonl"),
+        ("model_file", "models/model.joblib"),
+        ("metrics_file", "metrics.json"),
+        ("learner_state_file", "learner_state.json"),
+        ("learner_holdout_file", "holdout.jsonl"),
+    ]:
+        monkeypatch.setattr(settings, name, str(tmp_path / filename))
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "model_hash_features", 2 ** 12)
+    (tmp_path / "models").mkdir()
+    _append_samples(range(10))
+    return tmp_path
@@ -1,5 +1,5 @@
 import pytest
-from api.core.auth import get_password_hash, verify_password
+from core.auth import get_password_hash, verify_password
 
 
 def test_password_hashing():
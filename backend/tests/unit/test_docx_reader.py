@@ -0,0 +1,53 @@
+import io
+
+import docx
+
+from services.docx_reader import extract_docx_text, iter_part_lines
+
+
+def _build_docx() -> bytes:
+    d = docx.Document()
+    section = d.sections[0]
+    section.header.paragraphs[0].text = "ACME Lending Agreement"
+    section.footer.paragraphs[0].text = "Confidential"
+    d.add_paragraph("The borrower agrees to the following schedule.")
+    table = d.add_table(rows=2, cols=3)
+    for cell, value in zip(table.rows[0].cells, ["Due date", "Amount", "Penalty"]):
+        cell.text = value
+    for cell, value in zip(table.rows[1].cells, ["2025-01-01", "$1,000", "5%"]):
+        cell.text = value
+    d.add_paragraph("Signed by both parties.")
+    buf = io.BytesIO()
+    d.save(buf)
+    return buf.getvalue()
+
+
+def test_extract_docx_includes_tables_headers_and_footers():
+    """Test that tables, headers and footers are extracted in document order."""
+    lines = extract_docx_text(_build_docx()).split("\n")
+
+    assert lines[0] == "ACME Lending Agreement"
+    assert lines[-1] == "Confidential"
+    body = lines[1:-1]
+    assert body == [
+        "The borrower agrees to the following schedule.",
+        "Due date | Amount | Penalty",
+        "2025-01-01 | $1,000 | 5%",
+        "Signed by both parties.",
+    ]
+
+
+def test_iter_part_lines_streams_large_parts():
+    """Test that a large body part is streamed paragraph by paragraph."""
+    w = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    paragraph = "<w:p><w:r><w:t>Clause {}</w:t></w:r></w:p>"
+    xml = (
+        f'<w:document xmlns:w="{w}"><w:body>'
+        + "".join(paragraph.format(i) for i in range(5000))
+        + "</w:body></w:document>"
+    ).encode("utf-8")
+
+    lines = iter_part_lines(io.BytesIO(xml))
+
+    assert next(lines) == "Clause 0"
+    assert sum(1 for _ in lines) == 4999
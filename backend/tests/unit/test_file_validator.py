@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import io
+
+import fitz
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from core import file_validator
+from core.file_validator import (
+    DOCUMENT_UPLOAD_TYPES,
+    SCAN_UPLOAD_TYPES,
+    inspect_content,
+    validate_upload,
+)
+
+
+def _pdf_bytes() -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Payment is due within 30 days.")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def _upload(content: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=len(content))
+
+
+def test_inspect_content_hashes_and_finds_patterns_across_chunks(monkeypatch):
+    """Test that one pass yields the SHA-256 and catches a pattern split across chunks."""
+    monkeypatch.setattr(file_validator, "INSPECT_CHUNK_SIZE", 64)
+    content = b"a" * 61 + b"<SCRipt>" + b"b" * 100
+
+    result = inspect_content(content)
+
+    assert result.sha256 == hashlib.sha256(content).hexdigest()
+    assert result.suspicious is True
+    assert inspect_content(b"plain contract text" * 100).suspicious is False
+
+
+def test_validate_upload_accepts_real_pdf():
+    """Test that a PDF is sniffed from its header and hashed."""
+    content = _pdf_bytes()
+
+    upload = asyncio.run(validate_upload(_upload(content, "contract.pdf"), DOCUMENT_UPLOAD_TYPES, 1024 * 1024))
+
+    assert upload.mime_type == "application/pdf"
+    assert upload.sha256 == hashlib.sha256(content).hexdigest()
+    assert upload.size == len(content)
+
+
+def test_validate_upload_can_leave_content_on_the_spooled_file():
+    """Test that keep_content=False hashes the file in chunks and rewinds it for streaming to storage."""
+    content = _pdf_bytes()
+    file = UploadFile(file=io.BytesIO(content), filename="contract.pdf")
+
+    upload = asyncio.run(validate_upload(file, DOCUMENT_UPLOAD_TYPES, 1024 * 1024, keep_content=False))
+
+    assert upload.content is None
+    assert upload.sha256 == hashlib.sha256(content).hexdigest()
+    assert upload.size == len(content)
+    assert file.file.read() == content
+
+    oversized = UploadFile(file=io.BytesIO(content), filename="contract.pdf")
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(validate_upload(oversized, DOCUMENT_UPLOAD_TYPES, len(content) - 1, keep_content=False))
+    assert exc.value.status_code == 413
+
+
+@pytest.mark.parametrize(
+    "content, filename, allowed_types, status_code",
+    [
+        (b"just some text", "contract.pdf", DOCUMENT_UPLOAD_TYPES, 400),     # disguised type
+        (_pdf_bytes(), "contract.png", DOCUMENT_UPLOAD_TYPES, 400),          # extension mismatch
+        (b"", "contract.pdf", DOCUMENT_UPLOAD_TYPES, 400),                   # empty
+        (b"%PDF-1.4" + b"0" * 2048, "big.pdf", DOCUMENT_UPLOAD_TYPES, 413),  # over the limit
+        (b"just some text", "contract.pdf", SCAN_UPLOAD_TYPES, 400),         # text posing as PDF
+        (b"just some text", "contract.docx", SCAN_UPLOAD_TYPES, 400),        # text posing as DOCX
+        (_pdf_bytes(), "contract.txt", SCAN_UPLOAD_TYPES, 400),              # PDF posing as text
+    ],
+)
+def test_validate_upload_rejects(content, filename, allowed_types, status_code):
+    """Test that disguised, mismatched, empty and oversized uploads are rejected."""
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(validate_upload(_upload(content, filename), allowed_types, 1024))
+    assert exc.value.status_code == status_code
+
+
+@pytest.mark.parametrize("filename", ["contract.txt", "CONTRACT.TXT", "contract"])
+def test_validate_upload_accepts_plain_text_scans(filename):
+    """Test that plain text scans are accepted with a .txt extension or none."""
+    upload = asyncio.run(validate_upload(_upload(b"just some text", filename), SCAN_UPLOAD_TYPES, 1024))
+
+    assert upload.mime_type == "text/plain"
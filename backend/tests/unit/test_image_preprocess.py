@@ -0,0 +1,54 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from services.image_preprocess import (
+    adaptive_threshold,
+    downscale_to_dpi,
+    estimate_skew,
+    preprocess_for_ocr,
+)
+
+
+def _lined_page(width=1200, height=1600):
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(100, height - 100, 40):
+        draw.rectangle([100, y, width - 100, y + 8], fill=0)
+    return img
+
+
+def test_adaptive_threshold_handles_uneven_lighting():
+    """Test that ink is found on both the dark and bright side of a gradient."""
+    background = np.tile(np.linspace(90, 250, 200, dtype=np.float32), (100, 1))
+    page = background.copy()
+    page[45:55, 10:190] -= 60
+
+    binary = adaptive_threshold(page.astype(np.uint8), window=31, offset=10)
+
+    assert (binary[45:55, 20:30] == 0).all()
+    assert (binary[45:55, 170:180] == 0).all()
+    assert (binary[10:20, 20:180] == 255).all()
+
+
+def test_estimate_skew_recovers_rotation():
+    """Test that a page rotated by a few degrees is detected."""
+    rotated = _lined_page().rotate(-3, fillcolor=255, expand=True)
+
+    assert abs(estimate_skew(rotated, max_angle=5.0) - 3.0) <= 0.5
+
+
+def test_downscale_to_target_dpi():
+    """Test that oversized photos are reduced and small ones untouched."""
+    photo = Image.new("L", (4032, 3024), 255)
+    assert max(downscale_to_dpi(photo, 4032 / 11.69, 300).size) < 3600
+
+    small = Image.new("L", (1000, 800), 255)
+    assert downscale_to_dpi(small, 1000 / 11.69, 300) is small
+
+
+def test_preprocess_returns_binary_grayscale():
+    """Test the full stage output mode and value range."""
+    out = preprocess_for_ocr(_lined_page().convert("RGB"))
+
+    assert out.mode == "L"
+    assert set(np.unique(np.asarray(out))) <= {0, 255}
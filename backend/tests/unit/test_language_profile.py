@@ -0,0 +1,45 @@
+import re
+
+from services import language_profile
+from services.language_profile import merge_profiles, profile_segments, profile_text, segment_summary
+
+MIXED = "ភាគីទាំងពីរត្រូវគោរពតាមកិច្ចសន្យានេះ Payment is due within ៣០ days 😀\n\nThe tenant shall pay rent."
+
+
+def test_profile_text_matches_regex_counts():
+    """Test that the counts match the findall-based detection they replace."""
+    profile = profile_text(MIXED)
+
+    assert profile.khmer_chars == len(re.findall(r"[ក-៿]", MIXED))
+    assert profile.latin_chars == len(re.findall(r"[a-zA-Z]", MIXED))
+    assert profile.as_dict()["primary_language"] == "mixed"
+    assert profile.is_mixed is True
+    assert profile_text("").as_dict() == {
+        "primary_language": "unknown",
+        "is_mixed": False,
+        "khmer_ratio": 0.0,
+        "english_ratio": 0.0,
+    }
+
+
+def test_profile_segments_reports_each_paragraph():
+    """Test that paragraphs are profiled separately and add up to the whole text."""
+    text = "ភាគីទាំងពីរត្រូវគោរព\n\nThe tenant shall pay rent.\n\n\n\nកិច្ចសន្យា and contract"
+    segments = profile_segments(text)
+
+    assert [s.primary_language for s in segments] == ["khmer", "english", "mixed"]
+    assert segment_summary(segments) == {"khmer": 1, "english": 1, "mixed": 1}
+    assert merge_profiles(segments) == profile_text(text)
+
+
+def test_chunked_profiles_match_single_pass(monkeypatch):
+    """Test that slicing long texts into chunks leaves per-segment and whole-text profiles unchanged."""
+    text = ("ភាគីទាំងពីរត្រូវគោរព Payment is due 30 days.\n\n" * 5 + "The tenant shall pay rent. " * 4) * 3
+    whole_segments = profile_segments(text)
+    whole_text = profile_text(text)
+
+    for chunk_chars in (1, 7, 64):
+        monkeypatch.setattr(language_profile, "CHUNK_CHARS", chunk_chars)
+        assert profile_segments(text) == whole_segments
+        assert profile_text(text) == whole_text
+        assert merge_profiles(profile_segments(text)) == profile_text(text)
@@ -0,0 +1,32 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from core.config import settings
+from main import app
+from services import pipeline
+
+
+def test_metrics_endpoint_exposes_scan_histograms(monkeypatch):
+    """Test that /metrics serves Prometheus text including pipeline series."""
+    class FakeClient:
+        async def analyze_risks(self, text):
+            return [{"risk": "Late payment", "category": "Financial", "context": text}]
+
+    async def pages():
+        yield "Payment is due within 30 days."
+
+    monkeypatch.setattr(pipeline, "LLMClient", FakeClient)
+    monkeypatch.setattr(pipeline, "model_ready", lambda: False)
+    monkeypatch.setattr(pipeline, "_store_training_data", lambda *args: None)
+    monkeypatch.setattr(settings, "analysis_chunk_chars", 10)
+    asyncio.run(pipeline.analyze_pages(pages(), force_llm=True))
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "haniphei_scan_stage_seconds" in body
+    assert "haniphei_llm_request_seconds" in body
+    assert 'haniphei_queue_depth{queue="analysis_chunks"} 0.0' in body
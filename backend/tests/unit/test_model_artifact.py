@@ -0,0 +1,82 @@
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+from core.config import settings
+from services import inference, trainer
+from services.model_artifact import CompactModel
+
+TEXTS = [
+    "Payment of 40% is due on signing.",
+    "The works must be completed within 90 days, and either party may terminate.",
+    "ការទូទាត់ប្រាក់ត្រូវធ្វើឡើងក្នុងរយៈពេល ៣០ ថ្ងៃ",
+    "",
+]
+
+
+@pytest.mark.parametrize("mode", ["tfidf", "hashing"])
+def test_compact_artifact_matches_the_bundle(model_settings, monkeypatch, mode):
+    """Test that the exported artifact is memory-mapped and predicts like the bundle."""
+    monkeypatch.setattr(settings, "model_vectorizer", mode)
+    trainer.train_model()
+
+    model = CompactModel.load(inference.artifact_dir())
+    bundle = joblib.load(settings.model_file)
+    assert isinstance(model.coef, np.memmap)
+    for text in TEXTS:
+        X = bundle["vectorizer"].transform([text])
+        expected = bundle["classifier"].decision_function(X) if mode == "tfidf" else np.array(
+            [e.decision_function(X)[0] for e in bundle["classifier"].estimators_]
+        )
+        scores = model.decision_function(text)
+        # Categories missing from training are constant predictors, exported as -inf
+        fitted = np.isfinite(scores)
+        np.testing.assert_allclose(scores[fitted], expected.ravel()[fitted], rtol=1e-4, atol=1e-5)
+        assert model.predict(text) == sorted(bundle["mlb"].inverse_transform(bundle["classifier"].predict(X))[0])
+    assert trainer.predict_categories(TEXTS[0]) == model.predict(TEXTS[0])
+
+
+@pytest.mark.parametrize("mode, single_class", [("tfidf", False), ("hashing", False), ("tfidf", True), ("hashing", True)])
+def test_numpy_probabilities_match_sklearn(model_settings, append_samples, monkeypatch, mode, single_class):
+    """Test that sigmoid scores and thresholds from the stacked matrix equal the bundle's."""
+    monkeypatch.setattr(settings, "model_vectorizer", mode)
+    if single_class:
+        # Every sample is also Financial, so the first category only has one class
+        open(settings.training_file, "w").close()
+        append_samples(range(10), extra_labels=["Financial"])
+    trainer.train_model()
+    model = CompactModel.load(inference.artifact_dir())
+    reference = inference.BundleModel(joblib.load(settings.model_file))
+
+    np.testing.assert_allclose(model.thresholds, reference.thresholds)
+
+    expected = reference.predict_proba_batch(TEXTS)
+    batch = model.predict_proba_batch(TEXTS)
+
+    np.testing.assert_allclose(batch, expected, rtol=1e-5, atol=1e-6)
+    for text, row in zip(TEXTS, batch):
+        np.testing.assert_allclose(model.predict_proba(text), row, rtol=1e-9)
+        assert model.labels_from_proba(row) == reference.predict(text)
+        assert reference.labels_from_proba(reference.predict_proba(text)) == reference.predict(text)
+    probabilities = inference.predict_probabilities(TEXTS[0])
+    assert list(probabilities) == model.classes
+
+
+def test_stale_artifact_falls_back_to_the_bundle(model_settings, monkeypatch):
+    """Test that an artifact older than the bundle file is not used for predictions."""
+    trainer.train_model()
+    monkeypatch.setattr(settings, "model_compact", False)
+    trainer.save_bundle(joblib.load(settings.model_file))
+    monkeypatch.setattr(settings, "model_compact", True)
+    monkeypatch.setattr(CompactModel, "predict", lambda self, text: pytest.fail("stale artifact used"))
+
+    assert trainer.predict_categories(TEXTS[0]) == ["Financial"]
+
+
+def test_prediction_path_does_not_import_sklearn():
+    """Test that importing the scan pipeline leaves scikit-learn unloaded."""
+    code = "import sys, services.pipeline; sys.exit('sklearn' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,80 @@
+from PIL import Image
+
+from services import ocr_planner
+from services.ocr_planner import OcrPlanner, text_layer_quality
+
+
+def test_text_layer_quality_flags_garbage():
+    """Test that clean text scores high and broken encodings score low."""
+    assert text_layer_quality("Payment is due within 30 days.") == 1.0
+    assert text_layer_quality("កិច្ចសន្យាការងារ") == 1.0
+    assert text_layer_quality("�� ab") < 0.5
+    assert text_layer_quality("The contractorâ€™s feeâ€™s") < 0.85
+
+
+def test_planner_skips_ocr_for_good_text_layer():
+    """Test that only empty or garbled pages are sent to Tesseract."""
+    planner = OcrPlanner()
+
+    assert planner.needs_ocr("This agreement is made between the parties.") is False
+    assert planner.needs_ocr("   ") is True
+    assert planner.needs_ocr(" x" * 5) is True
+
+
+def test_planner_uses_english_for_latin_pages_and_caches(monkeypatch):
+    """Test that confident Latin pages OCR with eng only and detection is reused."""
+    monkeypatch.setattr(ocr_planner, "configured_languages", lambda: "eng+khm")
+    calls = {"osd": 0, "ocr": []}
+
+    def fake_osd(img, output_type=None):
+        calls["osd"] += 1
+        return {"script": "Latin", "script_conf": 10.0}
+
+    def fake_ocr(img, lang=None):
+        calls["ocr"].append(lang)
+        return "The tenant shall pay rent monthly."
+
+    monkeypatch.setattr(ocr_planner.pytesseract, "image_to_osd", fake_osd)
+    monkeypatch.setattr(ocr_planner.pytesseract, "image_to_string", fake_ocr)
+    planner = OcrPlanner(stable_after=2)
+    img = Image.new("RGB", (10, 10))
+
+    for _ in range(4):
+        planner.ocr(img)
+
+    assert calls["ocr"] == ["eng"] * 4
+    assert calls["osd"] == 2
+
+
+def test_planner_falls_back_when_cheap_pass_is_junk(monkeypatch):
+    """Test that a poor single-language result is redone with the full set."""
+    monkeypatch.setattr(ocr_planner, "configured_languages", lambda: "eng+khm")
+    monkeypatch.setattr(
+        ocr_planner.pytesseract, "image_to_osd",
+        lambda img, output_type=None: {"script": "Latin", "script_conf": 10.0},
+    )
+    monkeypatch.setattr(
+        ocr_planner.pytesseract, "image_to_string",
+        lambda img, lang=None: "~ |{ :; ]" if lang == "eng" else "កិច្ចសន្យា",
+    )
+    planner = OcrPlanner()
+
+    assert planner.ocr(Image.new("RGB", (10, 10))) == "កិច្ចសន្យា"
+    assert planner.decisions == ["eng+khm"]
+
+
+def test_planner_uses_latin_neighbour_when_osd_is_unsure(monkeypatch):
+    """Test that an English text layer stands in for an unconfident OSD pass."""
+    monkeypatch.setattr(ocr_planner, "configured_languages", lambda: "eng+khm")
+    monkeypatch.setattr(
+        ocr_planner.pytesseract, "image_to_osd",
+        lambda img, output_type=None: {"script": "Latin", "script_conf": 0.1},
+    )
+    planner = OcrPlanner()
+    img = Image.new("RGB", (10, 10))
+
+    assert planner.language_for(img) == "eng+khm"
+    planner.observe("This agreement is made between the parties named below.")
+    assert planner.language_for(img) == "eng"
+    planner.observe("ភាគីទាំងពីរត្រូវគោរពតាមកិច្ចសន្យានេះ")
+    assert planner.language_for(img) == "eng+khm"
@@ -0,0 +1,82 @@
+import json
+
+import joblib
+import pytest
+
+from core.config import settings
+from services import trainer
+from services.online_learner import OnlineLearner
+
+
+@pytest.fixture
+def learner(model_settings, monkeypatch):
+    monkeypatch.setattr(settings, "model_vectorizer", "hashing")
+    monkeypatch.setattr(settings, "learner_min_samples", 4)
+    monkeypatch.setattr(settings, "learner_holdout_every", 3)
+    monkeypatch.setattr(settings, "learner_min_holdout", 5)
+    trainer.train_model()
+    return OnlineLearner()
+
+
+def test_learner_publishes_new_versions_from_the_cursor(learner, append_samples):
+    """Test that only rows past the cursor are learned and each run publishes a version."""
+    assert learner.run_once()["status"] == "idle"
+
+    seeded = len(learner._load_holdout())
+    append_samples(range(10, 20))
+    result = learner.run_once()
+
+    assert result["status"] == "published"
+    assert result["version"] == 1
+    assert result["samples"] + result["holdout"] - seeded == 40  # ten new rows for each of the four categories
+    bundle = joblib.load(settings.model_file)
+    assert bundle["version"] == 1
+    assert bundle["cursor"] == len(open(settings.training_file, "rb").read())
+    assert learner.run_once()["status"] == "idle"
+
+
+def test_learner_rejects_updates_that_fail_the_holdout_gate(learner, append_samples, monkeypatch):
+    """Test that a rejected update keeps the live model but moves the cursor on."""
+    monkeypatch.setattr(settings, "learner_max_f1_drop", -1.0)
+    append_samples(range(10, 20))
+
+    result = learner.run_once()
+
+    assert result["status"] == "rejected"
+    assert joblib.load(settings.model_file)["version"] == 0
+    assert learner._load_state()["cursor"] == len(open(settings.training_file, "rb").read())
+
+
+def test_retrain_keeps_the_holdout_out_of_training(learner, append_samples):
+    """Test that a full retrain trains without the gate rows and replaces the holdout file with them."""
+    with open(settings.learner_holdout_file, "a", encoding="utf-8") as f:
+        f.write('{"text": "Row from an older lineage.", "labels": ["Other"]}\n')
+    append_samples(range(10, 20))
+
+    trainer.train_model()
+
+    holdout = learner._load_holdout()
+    texts = [json.loads(line)["text"] for line in open(settings.training_file, encoding="utf-8")]
+    assert [text for text, _ in holdout] == [t for t in texts if trainer.is_holdout(t)]
+    assert joblib.load(settings.model_file)["samples_seen"] == int(0.8 * (len(texts) - len(holdout)))
+
+
+def test_learner_waits_for_a_minimum_holdout(learner, append_samples, monkeypatch):
+    """Test that nothing is published or consumed while the gate has too few held-out samples."""
+    monkeypatch.setattr(settings, "learner_min_holdout", 1000)
+    append_samples(range(10, 20))
+
+    result = learner.run_once()
+
+    assert result["status"] == "idle"
+    assert joblib.load(settings.model_file)["version"] == 0
+    assert learner._load_state() == {}
+
+
+def test_learner_is_busy_while_a_retrain_holds_the_model(learner, append_samples):
+    """Test that a learner run cannot start while train_model holds the shared model lock."""
+    append_samples(range(10, 20))
+
+    with trainer.model_lock:
+        assert learner.run_once()["status"] == "busy"
+    assert learner.run_once()["status"] == "published"
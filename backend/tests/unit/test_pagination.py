@@ -0,0 +1,49 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from core.pagination import encode_cursor, decode_cursor, CountCache
+
+
+def test_cursor_roundtrip():
+    """Test that a cursor decodes back to the same keyset position."""
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    document_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, document_id)
+
+    assert decode_cursor(cursor) == (created_at, document_id)
+
+
+def test_invalid_cursor_rejected():
+    """Test that tampered cursors raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_count_cache_invalidation():
+    """Test that cached totals are dropped for the user only."""
+    cache = CountCache(ttl_seconds=60)
+    cache.set("user-a", None, 10)
+    cache.set("user-a", "camera", 3)
+    cache.set("user-b", None, 7)
+
+    cache.invalidate("user-a")
+
+    assert cache.get("user-a") is None
+    assert cache.get("user-a", "camera") is None
+    assert cache.get("user-b") == 7
+
+
+def test_count_cache_evicts_least_recently_used():
+    """Test that the cache stays within max_entries, dropping the entry read longest ago."""
+    cache = CountCache(ttl_seconds=60, max_entries=2)
+    cache.set("user-a", None, 1)
+    cache.set("user-b", None, 2)
+    assert cache.get("user-a") == 1
+
+    cache.set("user-c", None, 3)
+
+    assert cache.get("user-b") is None
+    assert cache.get("user-a") == 1
+    assert cache.get("user-c") == 3
@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+from core.config import settings
+from services import pipeline
+
+
+class FakeModel:
+    classes = ["Financial", "Legal"]
+    thresholds = np.full(2, 0.5)
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def predict_proba(self, text):
+        return np.array(self.scores[text])
+
+    def predict_proba_batch(self, texts):
+        return np.array([self.scores[text] for text in texts])
+
+    def labels_from_proba(self, proba):
+        return [c for c, p in zip(self.classes, proba) if p > 0.5]
+
+
+class FakeClient:
+    calls = []
+
+    async def analyze_risks(self, text):
+        FakeClient.calls.append(text)
+        return [{"risk": "Termination", "category": "Legal", "context": text}]
+
+
+def _use_model(monkeypatch, scores):
+    FakeClient.calls = []
+    monkeypatch.setattr(pipeline, "model_ready", lambda: True)
+    monkeypatch.setattr(pipeline, "get_model", lambda: FakeModel(scores))
+    monkeypatch.setattr(pipeline, "LLMClient", FakeClient)
+    monkeypatch.setattr(pipeline, "_store_training_data", lambda *args: None)
+    monkeypatch.setattr(settings, "routing_enabled", True)
+    monkeypatch.setattr(settings, "routing_min_confidence", 0.8)
+
+
+def test_confident_model_answer_skips_llm(monkeypatch):
+    """Test that a document the model is sure about is answered without the LLM."""
+    _use_model(monkeypatch, {"Payment is due.": [0.95, 0.1]})
+
+    result = asyncio.run(pipeline.analyze_text("Payment is due.", force_llm=False))
+
+    assert result["source"] == "model"
+    assert [(r["category"], r["context"]) for r in result["data"]] == [("Financial", "Payment is due.")]
+    assert result["routing"] == {"route": "model", "reason": "confident", "confidence": 0.9}
+    assert FakeClient.calls == []
+
+
+def test_uncertain_document_escalates_to_llm(monkeypatch):
+    """Test that a category near the decision boundary sends the document to the LLM."""
+    _use_model(monkeypatch, {"Either party may end this.": [0.05, 0.6]})
+
+    result = asyncio.run(pipeline.analyze_text("Either party may end this.", force_llm=False))
+
+    assert result["source"] == "llm"
+    assert result["routing"]["reason"] == "uncertain"
+    assert result["routing"]["uncertain"] == ["Legal"]
+    assert FakeClient.calls == ["Either party may end this."]
+
+    monkeypatch.setattr(settings, "routing_enabled", False)
+    result = asyncio.run(pipeline.analyze_text("Either party may end this.", force_llm=False))
+    assert result["source"] == "model"
+    assert result["routing"]["reason"] == "routing_disabled"
+
+
+def test_analyze_pages_routes_each_chunk(monkeypatch):
+    """Test that only uncertain chunks reach the LLM and the merged result is hybrid."""
+    sure, unsure = "Payment of the invoice is due.", "Either party may end this."
+    _use_model(monkeypatch, {sure: [0.97, 0.02], unsure: [0.1, 0.55]})
+    monkeypatch.setattr(settings, "analysis_chunk_chars", 10)
+
+    async def pages():
+        yield sure
+        yield unsure
+
+    result = asyncio.run(pipeline.analyze_pages(pages(), force_llm=False))
+
+    assert FakeClient.calls == [unsure]
+    assert result["source"] == "hybrid"
+    assert [c["route"] for c in result["routing"]["chunks"]] == ["model", "llm"]
+    assert sorted(r["category"] for r in result["data"]) == ["Financial", "Legal"]
+
+
+def test_model_routed_scan_records_inference_time(monkeypatch):
+    """Test that routing and span extraction on a model-routed document are timed in the inference histogram."""
+    _use_model(monkeypatch, {"Payment is due.": [0.95, 0.1]})
+    before = REGISTRY.get_sample_value("haniphei_model_inference_seconds_count") or 0.0
+
+    result = asyncio.run(pipeline.analyze_text("Payment is due.", force_llm=False))
+
+    assert result["source"] == "model"
+    assert REGISTRY.get_sample_value("haniphei_model_inference_seconds_count") == before + 2
@@ -0,0 +1,42 @@
+import pytest
+
+from core.config import settings
+from services import inference, trainer
+from services.span_extractor import extract_spans, split_sentences
+
+
+def test_split_sentences_handles_khmer_and_english():
+    """Test that Khmer khan, English terminators and newlines split sentences, but decimals do not."""
+    text = (
+        "ភាគីទាំងពីរត្រូវគោរពតាមកិច្ចសន្យានេះ។ការទូទាត់ត្រូវធ្វើឡើងក្នុង ៣០ ថ្ងៃ៕\n"
+        "A penalty of 0.5% applies per day. Either party may terminate!\n"
+        "Art. 3\n"
+    )
+
+    assert split_sentences(text) == [
+        "ភាគីទាំងពីរត្រូវគោរពតាមកិច្ចសន្យានេះ។",
+        "ការទូទាត់ត្រូវធ្វើឡើងក្នុង ៣០ ថ្ងៃ៕",
+        "A penalty of 0.5% applies per day.",
+        "Either party may terminate!",
+    ]
+
+
+@pytest.mark.parametrize("mode", ["tfidf", "hashing"])
+def test_extract_spans_returns_best_sentence_per_category(model_settings, monkeypatch, mode):
+    """Test that each predicted category is backed by the sentence the model scores highest for it."""
+    monkeypatch.setattr(settings, "model_vectorizer", mode)
+    monkeypatch.setattr(settings, "span_top_k", 1)
+    trainer.train_model()
+
+    text = (
+        "This agreement is made between the parties below.\n"
+        "Payment of 25% is due on signing and interest accrues on late invoices.\n"
+        "Either party may terminate with 60 days notice under the governing law."
+    )
+    items = extract_spans(inference.get_model(), text, ["Financial", "Legal"])
+
+    assert [(item["category"], item["context"]) for item in items] == [
+        ("Financial", "Payment of 25% is due on signing and interest accrues on late invoices."),
+        ("Legal", "Either party may terminate with 60 days notice under the governing law."),
+    ]
+    assert all(0.5 < item["confidence"] <= 1 for item in items)
@@ -0,0 +1,76 @@
+import asyncio
+
+import boto3
+import pytest
+
+from services import storage
+from services.storage import StorageService
+
+
+@pytest.fixture
+def service():
+    svc = StorageService()
+    svc.s3_client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+    return svc
+
+
+def test_presigned_url_is_cached(service):
+    """Test that repeated lookups reuse the same signed URL."""
+    first = service.get_cached_url("documents/u/a.pdf")
+    second = service.get_cached_url("documents/u/a.pdf")
+
+    assert first == second
+    assert "Signature=" in first
+
+
+def test_presigned_url_refreshed_near_expiry(service, monkeypatch):
+    """Test that a URL close to expiry is re-signed."""
+    now = 1_000_000.0
+    monkeypatch.setattr(storage.time, "time", lambda: now)
+    first = service.get_cached_url("documents/u/a.pdf", expires_in=3600)
+
+    now += 3600 - storage.PRESIGN_REFRESH_MARGIN + 1
+    service.s3_client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="rotated",
+        aws_secret_access_key="rotated",
+    )
+    second = service.get_cached_url("documents/u/a.pdf", expires_in=3600)
+
+    assert first != second
+
+
+def test_large_upload_uses_multipart(service):
+    """Test that bodies above the threshold are sent as parallel multipart parts."""
+    moto = pytest.importorskip("moto")
+    from boto3.s3.transfer import TransferConfig
+
+    with moto.mock_aws():
+        service.s3_client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        service.s3_client.create_bucket(Bucket=service.bucket_name)
+        service.transfer_config = TransferConfig(
+            multipart_threshold=5 * 1024 * 1024,
+            multipart_chunksize=5 * 1024 * 1024,
+            max_concurrency=4,
+        )
+        body = b"x" * (11 * 1024 * 1024)
+
+        s3_key, _ = asyncio.run(
+            service.upload_file(body, "u", "big.pdf", "application/pdf")
+        )
+
+        head = service.s3_client.head_object(Bucket=service.bucket_name, Key=s3_key)
+        assert head["ContentLength"] == len(body)
+        # Multipart ETags carry the part count suffix
+        assert head["ETag"].strip('"').endswith("-3")
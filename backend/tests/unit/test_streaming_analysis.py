@@ -0,0 +1,63 @@
+import asyncio
+
+import fitz
+
+from core.config import settings
+from services import ocr, pipeline
+
+
+def _build_pdf(pages):
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def test_aiter_document_pages_yields_each_pdf_page():
+    """Test that PDF pages are streamed in order and match the joined extraction."""
+    texts = [f"Clause {i}: the contractor shall deliver on schedule." for i in range(3)]
+    content = _build_pdf(texts)
+
+    async def collect():
+        stats = {}
+        pages = [page async for page in ocr.aiter_document_pages(content, "c.pdf", stats)]
+        return pages, stats
+
+    pages, stats = asyncio.run(collect())
+
+    assert [p.strip() for p in pages] == texts
+    assert stats["page_count"] == 3
+    assert stats["pages_ocr"] == 0
+    assert list(ocr.iter_document_pages(content, "c.pdf")) == pages
+
+
+def test_analyze_pages_starts_before_extraction_finishes(monkeypatch):
+    """Test that chunks are analyzed while pages are still arriving, and risks are merged."""
+    events = []
+
+    class FakeClient:
+        async def analyze_risks(self, text):
+            events.append(("analyze", text))
+            return [{"risk": "Late payment", "category": "Financial", "context": text}]
+
+    async def pages():
+        for i in range(3):
+            events.append(("page", i))
+            yield f"page {i} " * 10
+            await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(pipeline, "LLMClient", FakeClient)
+    monkeypatch.setattr(pipeline, "model_ready", lambda: False)
+    monkeypatch.setattr(pipeline, "_store_training_data", lambda *args: None)
+    monkeypatch.setattr(settings, "analysis_chunk_chars", 50)
+
+    result = asyncio.run(pipeline.analyze_pages(pages(), force_llm=True))
+
+    assert [e[0] for e in events[:3]] == ["page", "analyze", "page"]
+    assert sum(1 for e in events if e[0] == "analyze") == 3
+    assert result["source"] == "llm"
+    assert len(result["data"]) == 1
+    assert result["text"] == "\n".join(f"page {i} " * 10 for i in range(3))
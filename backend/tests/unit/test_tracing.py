@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.tracing import instrument_engine, traced_commit, tracer
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans():
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(_exporter))
+        trace.set_tracer_provider(provider)
+    _exporter.clear()
+    return _exporter
+
+
+def test_sql_and_commit_spans_nest_under_request_span(spans):
+    """Test that statements executed through the async engine become child spans."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+
+    async def run():
+        with tracer.start_as_current_span("request"):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with traced_commit("test"):
+                    await conn.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+
+    finished = {s.name: s for s in spans.get_finished_spans()}
+    root = finished["request"]
+    assert finished["SELECT"].parent.span_id == root.context.span_id
+    assert finished["SELECT"].attributes["db.statement"] == "SELECT 1"
+    assert finished["db.commit"].parent.span_id == root.context.span_id
+    assert finished["db.commit"].attributes["db.operation.name"] == "test"
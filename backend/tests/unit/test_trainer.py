@@ -0,0 +1,55 @@
+import json
+
+import joblib
+import pytest
+
+from core.config import settings
+from services import trainer
+
+def test_hashing_model_has_no_vocabulary_and_updates_incrementally(model_settings, monkeypatch):
+    """Test that hashing mode trains a vocabulary-free bundle that update_model extends."""
+    monkeypatch.setattr(settings, "model_vectorizer", "hashing")
+
+    trainer.train_model()
+    bundle = joblib.load(settings.model_file)
+    hashing = bundle["vectorizer"].steps[0][1]
+    assert not hasattr(hashing, "vocabulary_")
+    assert bundle["classifier"].estimators_[0].coef_.shape == (1, 2 ** 12)
+    assert trainer.predict_categories("Payment of 40% is due on signing.") == ["Financial"]
+
+    seen = bundle["samples_seen"]
+    texts = [f"The warehouse crew of {n} must follow the shift rota." for n in range(20)]
+    assert trainer.update_model(texts, [["Operational"]] * 20) == 20
+
+    assert joblib.load(settings.model_file)["samples_seen"] == seen + 20
+    assert "Operational" in trainer.predict_categories("The warehouse crew must follow the shift rota.")
+
+
+def test_update_model_rejects_vocabulary_models(model_settings):
+    """Test that a TF-IDF vocabulary model cannot be updated in place."""
+    trainer.train_model()
+
+    with pytest.raises(RuntimeError):
+        trainer.update_model(["Payment is due."], [["Financial"]])
+
+
+def test_grid_search_picks_parameters_and_reports_per_category_f1(model_settings, monkeypatch):
+    """Test that the search mode trains with the best candidate and records per-category F1."""
+    monkeypatch.setattr(settings, "model_search", "grid")
+    monkeypatch.setattr(settings, "model_search_folds", 2)
+    monkeypatch.setattr(settings, "model_search_jobs", 2)
+    monkeypatch.setattr(trainer, "SEARCH_GRID", {
+        "vectorizer__ngram_range": [(1, 1), (1, 2)],
+        "classifier__estimator__C": [1.0, 4.0],
+    })
+
+    trainer.train_model()
+
+    with open(settings.metrics_file, encoding="utf-8") as f:
+        metrics = json.load(f)
+    assert metrics["search"]["candidates"] == 4
+    assert set(metrics["f1_per_category"]) == set(trainer.CATEGORIES)
+    best = metrics["search"]["best_params"]
+    bundle = joblib.load(settings.model_file)
+    assert bundle["vectorizer"].ngram_range == tuple(best["vectorizer__ngram_range"])
+    assert bundle["classifier"].estimator.C == best["classifier__estimator__C"]